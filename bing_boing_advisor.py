@@ -0,0 +1,149 @@
+import argparse
+import json
+import sys
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from bing_boing_cli import get_available_strategies
+from board_codec import decode_board, encode_board
+from dice import dice_outcomes
+from map import CompiledMap, FileMap, bundled_map_path
+from number_state import NumberState
+from strategy_interface import Strategy
+
+class MoveAdvisor:
+    """
+    Answers (board, dice) -> move queries without constructing a game.
+
+    Maps are parsed and compiled once and strategies instantiated once.
+    Answers are cached per (map, strategy, board encoding, dice) in an LRU
+    cache holding at most cache_size entries.
+    """
+
+    def __init__(self, cache_size: int = 100_000):
+        self.cache_size = cache_size
+        self._cache: 'OrderedDict[Tuple[str, str, str, Tuple[int, int, int]], dict]' = OrderedDict()
+        self._maps: Dict[str, CompiledMap] = {}
+        self._strategies: Dict[str, Strategy] = {}
+        self._strategy_classes = {cls.__name__: cls for cls, _ in get_available_strategies().values()}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _get_map(self, map_name: str) -> CompiledMap:
+        if map_name not in self._maps:
+            self._maps[map_name] = FileMap(bundled_map_path(map_name)).compile()
+        return self._maps[map_name]
+
+    def _get_strategy(self, strategy_name: str) -> Strategy:
+        if strategy_name not in self._strategies:
+            if strategy_name not in self._strategy_classes:
+                raise ValueError(f"Unknown strategy: {strategy_name}")
+            self._strategies[strategy_name] = self._strategy_classes[strategy_name]()
+        return self._strategies[strategy_name]
+
+    def advise(self, map_name: str, strategy_name: str, board: str, dice: Tuple[int, int, int]) -> dict:
+        """
+        Return the strategy's move for a board and dice roll.
+
+        Returns:
+            Dict with the playable options, the chosen number (None when no
+            option is playable) and the dice formulas producing it
+        """
+        key = (map_name, strategy_name, board, dice)
+        answer = self._cache.get(key)
+        if answer is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return answer
+
+        answer = self._compute(map_name, strategy_name, board, dice)
+        self.misses += 1
+        self._cache[key] = answer
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+            self.evictions += 1
+        return answer
+
+    def _compute(self, map_name: str, strategy_name: str, board: str, dice: Tuple[int, int, int]) -> dict:
+        compiled = self._get_map(map_name)
+        strategy = self._get_strategy(strategy_name)
+        game_state = decode_board(board, compiled.numbers)
+        option_formulas = dice_outcomes(*dice)
+        playable = [num for num in sorted(option_formulas)
+                    if game_state.get(str(num)) == NumberState.not_crossed]
+        if not playable:
+            return {"options": [], "number": None, "formulas": []}
+        best_choice = strategy.select_best_option(set(playable), game_state, compiled.lines)
+        return {"options": playable, "number": best_choice, "formulas": list(option_formulas[best_choice])}
+
+    def encode(self, map_name: str, game_state: Dict[str, int]) -> str:
+        """Encode a {number: state value} dict in the board format used as cache key"""
+        compiled = self._get_map(map_name)
+        return encode_board({k: NumberState(v) for k, v in game_state.items()}, compiled.numbers)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._cache),
+            "evictions": self.evictions
+        }
+
+    def handle_query(self, query: dict) -> dict:
+        """
+        Answer one query.
+
+        Queries look like {"map": "blue", "strategy": "BalancedStrategy",
+        "board": "0120...", "dice": [3, 5, 6]}, where board is the encoding
+        from board_codec (a {"number": state value} dict may be sent as
+        "state" instead). {"op": "stats"} returns the cache statistics.
+        """
+        if query.get("op") == "stats":
+            return self.stats()
+        map_name = query.get("map", "blue")
+        strategy_name = query.get("strategy", "BalancedStrategy")
+        board: Optional[str] = query.get("board")
+        if board is None:
+            if "state" not in query:
+                raise ValueError("query needs a 'board' or 'state'")
+            board = self.encode(map_name, query["state"])
+        dice = query.get("dice")
+        if (not isinstance(dice, list) or len(dice) != 3
+                or not all(isinstance(value, int) and 1 <= value <= 6 for value in dice)):
+            raise ValueError("dice must be three integers between 1 and 6")
+        return self.advise(map_name, strategy_name, board, tuple(dice))
+
+def run_pipe(advisor: MoveAdvisor, input_stream=sys.stdin, output_stream=sys.stdout) -> None:
+    """Answer JSON-lines queries from input_stream until it closes"""
+    for line in input_stream:
+        if not line.strip():
+            continue
+        query = None
+        try:
+            query = json.loads(line)
+            if not isinstance(query, dict):
+                raise ValueError("Queries must be JSON objects")
+            response = advisor.handle_query(query)
+        except (ValueError, KeyError, TypeError) as error:
+            response = {"error": str(error.args[0]) if error.args else repr(error)}
+        except Exception as error:
+            # One bad query must not end the advisor process
+            response = {"error": f"Internal error: {error!r}"}
+        if isinstance(query, dict) and "id" in query:
+            response = {"id": query["id"], **response}
+        output_stream.write(json.dumps(response, separators=(',', ':')) + "\n")
+        output_stream.flush()
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer Bing Boing move queries as JSON lines on stdin/stdout")
+    parser.add_argument("--cache-size", type=int, default=100_000)
+    args = parser.parse_args()
+
+    advisor = MoveAdvisor(args.cache_size)
+    run_pipe(advisor)
+    print(json.dumps({"cache": advisor.stats()}), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
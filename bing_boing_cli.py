@@ -85,7 +85,8 @@ def main():
     game = BingBoingGame(
         strategy=SelectedStrategy(),
         save_file="game_state.json",
-        map=selected_map
+        map=selected_map,
+        speculate=True
     )
     game.initialize_game()
     game.display_state()
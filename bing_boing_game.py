@@ -1,29 +1,60 @@
-import json
-import os
 import random
-from typing import Dict, List, Set, Tuple
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 from default_strategy import DefaultStrategy
 from number_state import NumberState
 from game_stats import GameStats
-from map import FileMap
+from map import FileMap, Map
+from dice import dice_outcomes
+from game_events import GameObserver, MarkEvent
+from game_journal import GameJournal
+from speculative_moves import SpeculativeMoves
+from terminal_renderer import TerminalRenderer
+
+# Bump whenever a change alters game outcomes, so stored results are not mixed across versions
+ENGINE_VERSION = "2"
+
+def game_seed(seed: int, game_index: int) -> str:
+    """Return the random seed for one game of a seeded run"""
+    return f"{seed}:{game_index}"
 
 class BingBoingGame:
     """Main game class implementing the Bing Boing game logic"""
 
-    def __init__(self, strategy=None, save_file: str = "game_state.json", simulation_mode: bool = False, map: str = "./maps/blue.csv"):
+    def __init__(self, strategy=None, save_file: Optional[str] = "game_state.json", simulation_mode: bool = False, map="./maps/blue.csv",
+                 snapshot_interval: int = 25, speculate: bool = False):
         self.save_file = save_file
+        # Without a save file the game is kept in memory only
+        self.journal = GameJournal(save_file, snapshot_interval) if save_file else None
         self.strategy = strategy or DefaultStrategy()
         self.simulation_mode = simulation_mode
-        self.map = FileMap(map)
-        self.OPTIONS: List[List[int]] = self.map.find_consecutive_coordinates()
+        self.map = map if isinstance(map, Map) else FileMap(map)
+        self.compiled = self.map.compile()
+        self.OPTIONS: List[List[int]] = self.compiled.lines
+        # Uncrossed cells per line, and how many lines still hold more than one
+        self._initial_line_counts: List[int] = [len(option) for option in self.OPTIONS]
+        self._line_uncrossed: List[int] = []
+        self._open_lines: int = 0
+        self._pending_lines: List[int] = []  # Lines that may be down to one uncrossed cell
         self.game_state: Dict[str, NumberState] = {}
         self.turns_taken: int = 0
         self.game_won: bool = False
         self._last_dice_formulas: Dict[int, List[str]] = {}  # Track formula for each generated number
+        self.turn_marks: List[MarkEvent] = []  # Numbers marked during the current turn
+        # Running tallies kept up to date by mark_number
+        self.bing_count: int = 0
+        self.boing_count: int = 0
+        self._cascade_id: int = 0
+        self.observers: List[GameObserver] = []
+        self.renderer: Optional[TerminalRenderer] = None
+        # Precompute moves in the background while waiting for interactive input
+        self.speculate = speculate
+        self.speculator: Optional[SpeculativeMoves] = None
+        self._renderer_synced: bool = False
+        self._auto_playing: bool = False
 
     def initialize_game(self) -> None:
         """Initialize the game by either loading a saved state or starting fresh"""
-        if not self.simulation_mode and os.path.exists(self.save_file):
+        if not self.simulation_mode and self.journal is not None and self.journal.exists():
             while True:
                 choice = input("Saved game found. Load it? (y/n): ").strip().lower()
                 if choice in ['y', 'n']:
@@ -38,174 +69,186 @@ class BingBoingGame:
 
     def new_game(self) -> None:
         """Start a new game with fresh state"""
-        self.game_state = {str(num): NumberState.not_crossed for num in self.get_all_numbers()}
+        self.reset()
+        self.save_game_state()
+
+    def reset(self) -> None:
+        """
+        Return to the starting position without touching the disk.
+
+        The compiled map, game_state dict and line counters are reused and
+        overwritten in place, so back-to-back games allocate almost nothing.
+        """
+        if len(self.game_state) == len(self.compiled.numbers):
+            game_state = self.game_state
+            for key in game_state:
+                game_state[key] = NumberState.not_crossed
+        else:
+            self.game_state = {str(num): NumberState.not_crossed for num in self.compiled.numbers}
+        self._line_uncrossed[:] = self._initial_line_counts
+        self._open_lines = len(self._initial_line_counts)
+        self._pending_lines.clear()
+        self._renderer_synced = False
         self.turns_taken = 0
         self.game_won = False
-        self.save_game_state()
+        self.turn_marks.clear()
+        self.bing_count = 0
+        self.boing_count = 0
+        self._cascade_id = 0
+        for observer in self.observers:
+            observer.board_reset(self)
+
+    def add_observer(self, observer: GameObserver) -> None:
+        """Send the game's state changes to an observer"""
+        self.observers.append(observer)
+
+    def remove_observer(self, observer: GameObserver) -> None:
+        self.observers.remove(observer)
+
+    @property
+    def remaining_count(self) -> int:
+        """Numbers not crossed yet"""
+        return len(self.game_state) - self.bing_count - self.boing_count
 
     def get_all_numbers(self) -> Set[int]:
         """Returns a set of all numbers in the game grid"""
-        return set(num for option in self.OPTIONS for num in option)
+        return set(self.compiled.numbers)
+
+    def _rebuild_line_counts(self) -> None:
+        """Recompute the per-line counters and mark tallies from game_state"""
+        states = list(self.game_state.values())
+        self.bing_count = states.count(NumberState.bing)
+        self.boing_count = states.count(NumberState.boing)
+        uncrossed = {num for num in self.compiled.numbers
+                     if self.game_state[str(num)] == NumberState.not_crossed}
+        self._line_uncrossed = [sum(1 for num in option if num in uncrossed) for option in self.OPTIONS]
+        self._open_lines = sum(1 for count in self._line_uncrossed if count > 1)
+        self._pending_lines = []
+        self._renderer_synced = False
 
     def save_game_state(self) -> None:
-        """Save the current game state to a file"""
-        save_data = {
-            'game_state': {k: v.value for k, v in self.game_state.items()},
-            'turns_taken': self.turns_taken,
-            'game_won': self.game_won
-        }
-        with open(self.save_file, "w") as file:
-            json.dump(save_data, file)
+        """Write a compacted snapshot of the current game state"""
+        if self.journal is None:
+            return
+        self.journal.write_snapshot(
+            {k: v.value for k, v in self.game_state.items()},
+            self.turns_taken,
+            self.game_won
+        )
+
+    def record_turn(self, dice: Tuple[int, int, int]) -> None:
+        """Append the marks made this turn to the journal, compacting it periodically"""
+        if self.journal is None:
+            return
+        number = self.turn_marks[0].number
+        boings = [event.number for event in self.turn_marks if event.mark_type == NumberState.boing]
+        if self.journal.append_turn(self.turns_taken, dice, number, boings, self.game_won):
+            self.save_game_state()
 
     def load_game_state(self) -> None:
-        """Load game state from file"""
-        with open(self.save_file, "r") as file:
-            save_data = json.load(file)
-            self.game_state = {k: NumberState(v) for k, v in save_data['game_state'].items()}
-            self.turns_taken = save_data.get('turns_taken', 0)
-            self.game_won = save_data.get('game_won', False)
+        """Load the last snapshot and replay the turns journaled after it"""
+        saved_state, turns_taken, game_won, records = self.journal.load()
+        game_state = {k: NumberState(v) for k, v in saved_state.items()}
+        for record in records:
+            game_state[str(record['n'])] = NumberState.bing
+            for num in record['b']:
+                game_state[str(num)] = NumberState.boing
+            turns_taken = record['t']
+            game_won = bool(record.get('w', 0))
+        self.restore_state(game_state, turns_taken, game_won)
+
+    def restore_state(self, game_state: Dict[str, NumberState], turns_taken: int = 0, game_won: bool = False) -> None:
+        """Replace the current game with the given board and progress"""
+        self.game_state = game_state
+        self.turns_taken = turns_taken
+        self.game_won = game_won
+        self.turn_marks.clear()
+        self._cascade_id = 0
+        self._rebuild_line_counts()
+        for observer in self.observers:
+            observer.board_reset(self)
 
     def mark_number(self, number: int, mark_type: NumberState = NumberState.bing) -> None:
         """Mark a number and handle chain reactions"""
         str_number = str(number)
         if self.game_state[str_number] == NumberState.not_crossed:
             self.game_state[str_number] = mark_type
+            if mark_type == NumberState.bing:
+                self.bing_count += 1
+                self._cascade_id += 1
+            else:
+                self.boing_count += 1
+            event = MarkEvent(number, mark_type, self.turns_taken + 1, self._cascade_id)
+            self.turn_marks.append(event)
+            for observer in self.observers:
+                observer.number_marked(event)
+            self._update_line_counts(number)
             if not self.simulation_mode:
                 print(f"Marked {number} as '{mark_type}'")
             if mark_type == NumberState.bing:
                 self.check_for_boings()
-            self.save_game_state()
+
+    def _update_line_counts(self, number: int) -> None:
+        """Update the counters of the lines containing a newly marked number"""
+        line_uncrossed = self._line_uncrossed
+        for line_index, occurrences in self.compiled.lines_by_number[number]:
+            before = line_uncrossed[line_index]
+            after = before - occurrences
+            line_uncrossed[line_index] = after
+            if before > 1 >= after:
+                self._open_lines -= 1
+            if after == 1:
+                self._pending_lines.append(line_index)
 
     def check_for_boings(self) -> None:
         """Check for and handle chain reactions of boings"""
-        updated = True
-        while updated:
-            updated = False
-            for option in self.OPTIONS:
-                option_states = [self.game_state[str(num)] for num in option]
-                not_crossed_count = sum(1 for state in option_states 
-                                      if state == NumberState.not_crossed)
-                
-                if not_crossed_count == 1:
-                    for num in option:
-                        if self.game_state[str(num)] == NumberState.not_crossed:
-                            self.mark_number(num, NumberState.boing)
-                            updated = True
-                            break
+        # Only lines whose counter dropped to one can trigger a boing, so the
+        # cascade visits the affected lines instead of rescanning the board.
+        while self._pending_lines:
+            line_index = self._pending_lines.pop()
+            if self._line_uncrossed[line_index] != 1:
+                continue
+            for num in self.OPTIONS[line_index]:
+                if self.game_state[str(num)] == NumberState.not_crossed:
+                    self.mark_number(num, NumberState.boing)
+                    break
 
     def check_win_condition(self) -> bool:
         """Check if the game is won by checking if no more moves are possible"""
-        remaining_numbers = {num for num in self.get_all_numbers() 
-                           if self.game_state[str(num)] == NumberState.not_crossed}
-        
-        if not remaining_numbers:
+        # Won once no line has more than one uncrossed number left, which
+        # includes the case where every number has been crossed.
+        if self._open_lines == 0:
             self.game_won = True
             return True
-            
-        # Check if any remaining numbers can form valid pairs
-        for option in self.OPTIONS:
-            uncrossed_in_option = sum(1 for num in option 
-                                    if self.game_state[str(num)] == NumberState.not_crossed)
-            if uncrossed_in_option > 1:
-                return False
-                
-        self.game_won = True
-        return True
+        return False
 
     def generate_options(self, red: int, white1: int, white2: int) -> List[int]:
         """Generate all possible moves from dice values"""
-        options = set()
-        option_formulas = {}  # Track formula for each generated number
-        playable_numbers = {num for num in self.get_all_numbers() 
-                           if self.game_state[str(num)] == NumberState.not_crossed}
-
-        for white in [white1, white2]:
-            # Addition
-            result = red + white
-            options.add(result)
-            option_formulas[result] = option_formulas.get(result, []) + [f"{red} + {white}"]
-            
-            # Subtraction (both ways)
-            result = red - white
-            if result > 0:
-                options.add(result)
-                option_formulas[result] = option_formulas.get(result, []) + [f"{red} - {white}"]
-                
-            result = white - red
-            if result > 0:
-                options.add(result)
-                option_formulas[result] = option_formulas.get(result, []) + [f"{white} - {red}"]
-            
-            # Multiplication
-            result = red * white
-            options.add(result)
-            option_formulas[result] = option_formulas.get(result, []) + [f"{red} × {white}"]
-            
-            # Division (both ways)
-            if white != 0 and red % white == 0:
-                result = red // white
-                options.add(result)
-                option_formulas[result] = option_formulas.get(result, []) + [f"{red} ÷ {white}"]
-                
-            if red != 0 and white % red == 0:
-                result = white // red
-                options.add(result)
-                option_formulas[result] = option_formulas.get(result, []) + [f"{white} ÷ {red}"]
-                
-            # Exponents (both ways)
-            result = red ** white
-            if result <= 1000:  # Avoid huge numbers
-                options.add(result)
-                option_formulas[result] = option_formulas.get(result, []) + [f"{red}^{white}"]
-                
-            result = white ** red
-            if result <= 1000:  # Avoid huge numbers
-                options.add(result)
-                option_formulas[result] = option_formulas.get(result, []) + [f"{white}^{red}"]
-                
-            # Concatenation (both ways)
-            result = int(f"{red}{white}")
-            options.add(result)
-            option_formulas[result] = option_formulas.get(result, []) + [f"{red}{white} (concat)"]
-            
-            result = int(f"{white}{red}")
-            options.add(result)
-            option_formulas[result] = option_formulas.get(result, []) + [f"{white}{red} (concat)"]
+        option_formulas = dice_outcomes(red, white1, white2)
+        playable = [num for num in sorted(option_formulas)
+                    if self.game_state.get(str(num)) == NumberState.not_crossed]
 
-        # Filter playable numbers and sort them
-        playable = [(num, option_formulas.get(num, [])) for num in sorted(options) if num in playable_numbers]
-        
-        # Return only the numbers for compatibility with existing code
-        self._last_dice_formulas = {num: formulas for num, formulas in playable}
-        return [num for num, _ in playable]
+        self._last_dice_formulas = {num: list(option_formulas[num]) for num in playable}
+        return playable
 
-    def display_state(self) -> None:
-        """Display the current game state"""
+    def display_state(self, force: bool = True) -> None:
+        """
+        Display the current game state.
+
+        Unforced displays are throttled to the renderer's frame rate, which
+        keeps auto-play from being dominated by redrawing the board.
+        """
         if self.simulation_mode:
             return
-            
-        print("\nCurrent game state:")
-        
-        bing_count = sum(1 for state in self.game_state.values() 
-                        if state == NumberState.bing)
-        boing_count = sum(1 for state in self.game_state.values() 
-                         if state == NumberState.boing)
-        remaining_count = sum(1 for state in self.game_state.values() 
-                            if state == NumberState.not_crossed)
-        
-        self.map.display_map(self.game_state)
-        # for option in self.OPTIONS:
-        #     display_option = []
-        #     for num in option:
-        #         state = self.game_state[str(num)]
-        #         symbol = 'O' if state == NumberState.boing else 'X' if state == NumberState.bing else '...'
-        #         display_option.append(f"{num}[{symbol}]")
-        #     print(" | ".join(display_option))
-
-        print(f"\nTurns taken: {self.turns_taken}")
-        print(f"Total bings (X): {bing_count}")
-        print(f"Total boings (O): {boing_count}")
-        print(f"Remaining numbers: {remaining_count}\n")
+
+        if self.renderer is None:
+            self.renderer = TerminalRenderer(self.map)
+        if self._renderer_synced:
+            self.renderer.update(self.turn_marks)
+        else:
+            self.renderer.reset(self.game_state)
+            self._renderer_synced = True
+        self.renderer.render(self.turns_taken, force=force)
 
     def roll_dice(self) -> Tuple[int, int, int]:
         """Simulate rolling the dice"""
@@ -224,6 +267,7 @@ class BingBoingGame:
             return False
 
         self._last_dice_formulas = {}  # Reset the formula tracking
+        self.turn_marks.clear()
         playable_options = self.generate_options(red, white1, white2)
         if not self.simulation_mode:
             print("Playable options:", playable_options)
@@ -233,17 +277,29 @@ class BingBoingGame:
 
         if playable_options:
             # Get detailed calculation explanation along with the best choice
-            best_choice, explanation = self.strategy.explain_selection(set(playable_options), self.game_state, self.OPTIONS)
+            move = None
+            if self.speculator is not None and not self._auto_playing:
+                move = self.speculator.lookup(playable_options)
+            if move is None:
+                move = self.strategy.explain_selection(set(playable_options), self.game_state, self.OPTIONS)
+            best_choice, explanation = move
             if not self.simulation_mode:
                 print("Best choice:", best_choice)
                 print(f"Dice formula used: {', '.join(self._last_dice_formulas.get(best_choice, []))}")
                 print("Strategy reasoning:", explanation)
             
+            dice = (red, white1, white2)
+            for observer in self.observers:
+                observer.move_chosen(self, dice, playable_options, best_choice)
             self.mark_number(best_choice)
             self.turns_taken += 1
-            self.display_state()
+            won = self.check_win_condition()
+            self.record_turn(dice)
+            for observer in self.observers:
+                observer.turn_finished(self, dice, self.turn_marks)
+            self.display_state(force=won or not self._auto_playing)
             
-            if self.check_win_condition():
+            if won:
                 if not self.simulation_mode:
                     print(f"\n🎉 Congratulations! You've won the game in {self.turns_taken} turns! 🎉")
                     self.display_final_stats()
@@ -259,22 +315,8 @@ class BingBoingGame:
 
     def collect_stats(self) -> GameStats:
         """Collect and return game statistics"""
-        bing_count = sum(1 for state in self.game_state.values() 
-                        if state == NumberState.bing)
-        boing_count = sum(1 for state in self.game_state.values() 
-                         if state == NumberState.boing)
-        total_marked = bing_count + boing_count
-        
-        return GameStats(
-            turns_taken=self.turns_taken,
-            bing_count=bing_count,
-            boing_count=boing_count,
-            total_marked=total_marked,
-            boing_efficiency=boing_count / total_marked * 100 if total_marked > 0 else 0,
-            marks_per_turn=total_marked / self.turns_taken if self.turns_taken > 0 else 0,
-            won=self.game_won,
-            final_state=self.game_state.copy()
-        )
+        return GameStats.from_counts(self.turns_taken, self.bing_count, self.boing_count,
+                                     self.game_won, self.game_state.copy())
 
     def simulate_game(self) -> GameStats:
         """Run a complete game simulation with random dice rolls"""
@@ -286,6 +328,23 @@ class BingBoingGame:
         
         return self.collect_stats()
 
+    def simulate_many(self, num_games: int, seed: Optional[int] = None, first_game: int = 0) -> Iterator[GameStats]:
+        """
+        Simulate games back to back on this instance, yielding each game's statistics.
+
+        The game is reset in place between games and nothing is saved. With a
+        seed, game i reseeds the random module from game_seed(seed, i), so the
+        games match those of a seeded run_simulation.
+        """
+        for game_index in range(first_game, first_game + num_games):
+            if seed is not None:
+                random.seed(game_seed(seed, game_index))
+            self.reset()
+            while not self.game_won:
+                red, white1, white2 = self.roll_dice()
+                self.play_turn(red, white1, white2)
+            yield self.collect_stats()
+
     def play_game(self) -> GameStats:
         """Run the interactive game loop or simulation"""
         if self.simulation_mode:
@@ -293,24 +352,52 @@ class BingBoingGame:
             
         print("\nEnter dice values as three digits (e.g., '356')")
         print("Press 'a' for auto-roll")
+        print("Enter 'auto' to auto-roll until the game ends")
         print("Enter 'q' to quit\n")
         
-        while not self.game_won:
-            dice_input = input("Dice values or command: ").strip().lower()
-            if dice_input == 'q':
-                break
-            elif dice_input == 'a':
-                red, white1, white2 = self.roll_dice()
-                self.play_turn(red, white1, white2)
-            else:
-                try:
-                    red, white1, white2 = map(int, list(dice_input))
-                    self.play_turn(red, white1, white2)
-                except ValueError:
-                    print("Invalid input. Please enter three digits without spaces (e.g., '356') or 'a' for auto-roll")
+        # Speculating on a random strategy would make auto-rolled dice depend on thread timing
+        if self.speculate and self.strategy.deterministic:
+            self.speculator = SpeculativeMoves(self.strategy)
+            self.speculator.start(self.game_state, self.OPTIONS)
+        try:
+            while not self.game_won:
+                dice_input = input("Dice values or command: ").strip().lower()
+                played = False
+                if dice_input == 'q':
+                    break
+                elif dice_input == 'a':
+                    red, white1, white2 = self.roll_dice()
+                    played = self.play_turn(red, white1, white2)
+                elif dice_input == 'auto':
+                    if self.speculator is not None:
+                        self.speculator.cancel()
+                    self.auto_play()
+                else:
+                    try:
+                        red, white1, white2 = map(int, list(dice_input))
+                        played = self.play_turn(red, white1, white2)
+                    except ValueError:
+                        print("Invalid input. Please enter three digits without spaces (e.g., '356') or 'a' for auto-roll")
+                # The precomputed moves stay valid until the board changes
+                if played and self.speculator is not None:
+                    self.speculator.start(self.game_state, self.OPTIONS)
+        finally:
+            if self.speculator is not None:
+                self.speculator.close()
+                self.speculator = None
         
         return self.collect_stats()
 
+    def auto_play(self) -> None:
+        """Roll and play turns until the game is won, redrawing the board at a throttled rate"""
+        self._auto_playing = True
+        try:
+            while not self.game_won:
+                red, white1, white2 = self.roll_dice()
+                self.play_turn(red, white1, white2)
+        finally:
+            self._auto_playing = False
+
     def display_final_stats(self) -> None:
         """Display final game statistics"""
         if self.simulation_mode:
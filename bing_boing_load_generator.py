@@ -0,0 +1,87 @@
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from typing import List, Optional
+
+class LoadClient:
+    """One connection to the game server playing games back to back"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.games_finished = 0
+
+    async def request(self, request: dict) -> dict:
+        start = time.perf_counter()
+        self.writer.write(json.dumps(request).encode() + b"\n")
+        await self.writer.drain()
+        response = json.loads(await self.reader.readline())
+        self.latencies.append(time.perf_counter() - start)
+        if not response.get("ok"):
+            self.errors += 1
+        return response
+
+    async def play(self, deadline: float, strategy: str, map_name: str) -> None:
+        rng = random.Random()
+        session = None
+        while time.perf_counter() < deadline:
+            if session is None:
+                session = (await self.request({"op": "new", "strategy": strategy, "map": map_name})).get("session")
+                if session is None:
+                    return
+            dice = [rng.randint(1, 6) for _ in range(3)]
+            response = await self.request({"op": "turn", "session": session, "dice": dice})
+            if response.get("won"):
+                await self.request({"op": "close", "session": session})
+                self.games_finished += 1
+                session = None
+        self.writer.close()
+
+async def connect(host: str, port: int, unix_path: Optional[str]):
+    if unix_path:
+        return await asyncio.open_unix_connection(unix_path)
+    return await asyncio.open_connection(host, port)
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+async def run_load(host: str, port: int, unix_path: Optional[str], clients: int, duration: float,
+                   strategy: str, map_name: str) -> None:
+    """Drive the server from many concurrent connections and report throughput and latency"""
+    connections = [LoadClient(*await connect(host, port, unix_path)) for _ in range(clients)]
+    start = time.perf_counter()
+    await asyncio.gather(*(client.play(start + duration, strategy, map_name) for client in connections))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for client in connections for latency in client.latencies)
+    if not latencies:
+        print("No requests completed")
+        return
+    print(f"\nLoad test: {clients} clients for {elapsed:.1f}s ({strategy}, {map_name} map)")
+    print(f"Requests: {len(latencies)} ({sum(client.errors for client in connections)} errors)")
+    print(f"Games finished: {sum(client.games_finished for client in connections)}")
+    print(f"Throughput: {len(latencies) / elapsed:.1f} requests/sec")
+    print(f"Latency p50: {statistics.median(latencies) * 1000:.2f} ms")
+    print(f"Latency p99: {percentile(latencies, 0.99) * 1000:.2f} ms")
+    print(f"Latency max: {latencies[-1] * 1000:.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate load against a local Bing Boing game server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="Connect to a Unix socket instead of TCP")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--strategy", default="BalancedStrategy")
+    parser.add_argument("--map", default="blue")
+    args = parser.parse_args()
+    asyncio.run(run_load(args.host, args.port, args.unix, args.clients, args.duration, args.strategy, args.map))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+import argparse
+import asyncio
+import json
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from bing_boing_cli import get_available_strategies
+from bing_boing_game import BingBoingGame
+from game_journal import write_atomic
+from map import FileMap, Map, bundled_map_path
+from number_state import NumberState
+
+@dataclass
+class Session:
+    """An in-memory game hosted by the server"""
+    session_id: str
+    strategy_name: str
+    map_name: str
+    game: BingBoingGame
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    dirty: bool = False
+
+class GameServer:
+    """
+    Hosts many concurrent games over a JSON-lines socket protocol.
+
+    Every request is one JSON object on its own line with an "op" field and is
+    answered by one JSON line. Engines stay in memory; strategy advice runs on
+    a bounded thread pool so a slow strategy never blocks the event loop, and
+    changed sessions are written to state_dir in periodic batches.
+
+    Operations:
+        new:   {"op": "new", "strategy": "BalancedStrategy", "map": "blue"}
+        turn:  {"op": "turn", "session": id, "dice": [red, white1, white2]}
+        state: {"op": "state", "session": id}
+        close: {"op": "close", "session": id}
+        stats: {"op": "stats"}
+    """
+
+    def __init__(self, state_dir: str = "server_state", advice_workers: int = 4,
+                 max_pending: int = 64, flush_interval: float = 1.0):
+        self.state_dir = state_dir
+        self.flush_interval = flush_interval
+        self.executor = ThreadPoolExecutor(max_workers=advice_workers, thread_name_prefix="advice")
+        # Caps the turns queued on the executor; further requests wait their turn
+        self._pending = asyncio.Semaphore(max_pending)
+        # Held while a batch is written, so closing a session cannot race its last write
+        self._flush_lock = asyncio.Lock()
+        self.sessions: Dict[str, Session] = {}
+        self.strategies = {cls.__name__: cls for cls, _ in get_available_strategies().values()}
+        self._maps: Dict[str, Map] = {}
+        self.requests_served = 0
+        self.flushes = 0
+        os.makedirs(state_dir, exist_ok=True)
+
+    def _get_map(self, map_name: str) -> Map:
+        """Load and compile each map once, shared by all sessions playing it"""
+        if map_name not in self._maps:
+            board = FileMap(bundled_map_path(map_name))
+            board.compile()
+            self._maps[map_name] = board
+        return self._maps[map_name]
+
+    def _create_session(self, strategy_name: str, map_name: str, session_id: Optional[str] = None) -> Session:
+        if strategy_name not in self.strategies:
+            raise ValueError(f"Unknown strategy: {strategy_name}")
+        game = BingBoingGame(
+            strategy=self.strategies[strategy_name](),
+            save_file=None,
+            simulation_mode=True,
+            map=self._get_map(map_name)
+        )
+        game.new_game()
+        session = Session(session_id or uuid.uuid4().hex, strategy_name, map_name, game)
+        self.sessions[session.session_id] = session
+        return session
+
+    def _session_path(self, session_id: str) -> str:
+        return os.path.join(self.state_dir, f"{session_id}.json")
+
+    def _get_session(self, session_id: str) -> Session:
+        """Return a live session, restoring it from its last flushed state if needed"""
+        session = self.sessions.get(session_id)
+        if session is not None:
+            return session
+        if not isinstance(session_id, str) or not session_id.isalnum() or not os.path.exists(self._session_path(session_id)):
+            raise KeyError(f"Unknown session: {session_id}")
+        with open(self._session_path(session_id), "r") as file:
+            save_data = json.load(file)
+        session = self._create_session(save_data['strategy'], save_data['map'], session_id)
+        session.game.restore_state(
+            {k: NumberState(v) for k, v in save_data['game_state'].items()},
+            save_data['turns_taken'],
+            save_data['game_won']
+        )
+        return session
+
+    async def handle_request(self, request: dict) -> dict:
+        op = request.get("op")
+        if op == "new":
+            session = self._create_session(request.get("strategy", "BalancedStrategy"), request.get("map", "blue"))
+            session.dirty = True
+            return {"session": session.session_id}
+        if op == "turn":
+            return await self._play_turn(self._get_session(request.get("session")), request.get("dice"))
+        if op == "state":
+            game = self._get_session(request.get("session")).game
+            return {
+                "game_state": {k: v.value for k, v in game.game_state.items()},
+                "turns_taken": game.turns_taken,
+                "won": game.game_won
+            }
+        if op == "close":
+            session_id = request.get("session")
+            self._get_session(session_id)
+            async with self._flush_lock:
+                del self.sessions[session_id]
+                if os.path.exists(self._session_path(session_id)):
+                    os.remove(self._session_path(session_id))
+            return {}
+        if op == "stats":
+            return {"sessions": len(self.sessions), "requests": self.requests_served, "flushes": self.flushes}
+        raise ValueError(f"Unknown op: {op}")
+
+    async def _play_turn(self, session: Session, dice) -> dict:
+        if (not isinstance(dice, list) or len(dice) != 3
+                or not all(isinstance(value, int) and 1 <= value <= 6 for value in dice)):
+            raise ValueError("dice must be three integers between 1 and 6")
+        loop = asyncio.get_running_loop()
+        # Turns of one session are applied in order; different sessions run concurrently
+        async with session.lock, self._pending:
+            played = await loop.run_in_executor(self.executor, session.game.play_turn, *dice)
+            session.dirty = True
+            game = session.game
+            marks = game.turn_marks if played else []
+            return {
+                "played": played,
+                "number": marks[0].number if marks else None,
+                "boings": [event.number for event in marks if event.mark_type == NumberState.boing],
+                "turns_taken": game.turns_taken,
+                "won": game.game_won
+            }
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request = None
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("Requests must be JSON objects")
+                    response = {"ok": True, **await self.handle_request(request)}
+                except (ValueError, KeyError, TypeError) as error:
+                    response = {"ok": False, "error": str(error.args[0]) if error.args else repr(error)}
+                except Exception as error:
+                    # A bad request must never cost the client its connection
+                    response = {"ok": False, "error": f"Internal error: {error!r}"}
+                if isinstance(request, dict) and "id" in request:
+                    response["id"] = request["id"]
+                self.requests_served += 1
+                writer.write(json.dumps(response, separators=(',', ':')).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def _collect_dirty(self) -> List[Tuple[str, str]]:
+        """Snapshot the changed sessions on the event loop so flushing never sees a half-played turn"""
+        batch = []
+        for session in self.sessions.values():
+            if session.dirty and not session.lock.locked():
+                game = session.game
+                save_data = {
+                    'game_state': {k: v.value for k, v in game.game_state.items()},
+                    'turns_taken': game.turns_taken,
+                    'game_won': game.game_won,
+                    'strategy': session.strategy_name,
+                    'map': session.map_name
+                }
+                batch.append((self._session_path(session.session_id), json.dumps(save_data, separators=(',', ':'))))
+                session.dirty = False
+        return batch
+
+    def _write_batch(self, batch: List[Tuple[str, str]]) -> None:
+        for path, content in batch:
+            write_atomic(path, content)
+
+    async def flush(self) -> None:
+        """Write all changed sessions to disk in one batch"""
+        async with self._flush_lock:
+            batch = self._collect_dirty()
+            if batch:
+                await asyncio.get_running_loop().run_in_executor(None, self._write_batch, batch)
+                self.flushes += 1
+
+    async def flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765, unix_path: Optional[str] = None) -> None:
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_client, path=unix_path)
+            print(f"Serving Bing Boing games on {unix_path}")
+        else:
+            server = await asyncio.start_server(self.handle_client, host, port)
+            print(f"Serving Bing Boing games on {host}:{port}")
+        flusher = asyncio.create_task(self.flush_periodically())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            flusher.cancel()
+            await self.flush()
+            self.executor.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser(description="Host concurrent Bing Boing games over JSON lines")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="Listen on a Unix socket instead of TCP")
+    parser.add_argument("--state-dir", default="server_state")
+    parser.add_argument("--advice-workers", type=int, default=4)
+    parser.add_argument("--max-pending", type=int, default=64)
+    parser.add_argument("--flush-interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    server = GameServer(args.state_dir, args.advice_workers, args.max_pending, args.flush_interval)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
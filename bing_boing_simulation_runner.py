@@ -1,9 +1,11 @@
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional
 import statistics
 from bing_boing_game import BingBoingGame
 from strategy_interface import Strategy
 from game_stats import GameStats
+from results_cache import ResultsCache, cache_key
+from simulation_telemetry import RunTelemetry
 from default_strategy import DefaultStrategy
 from tabulate import tabulate
 from strategies import AggressiveBoingStrategy, LineCompletionStrategy, BalancedStrategy, RandomStrategy, MaxNumberStrategy, ChainReactionMaximiser
@@ -22,19 +24,37 @@ class SimulationResults:
     worst_game: GameStats
     all_games: List[GameStats]
 
-def run_simulation(strategy: Strategy, num_games: int = 100) -> SimulationResults:
-    """Run multiple games with a given strategy and return aggregated results"""
-    games: List[GameStats] = []
-    
-    for _ in range(num_games):
-        game = BingBoingGame(
-            strategy=strategy, 
-            simulation_mode=True,
-            map='./maps/yellow.csv'
-        )
-        stats = game.simulate_game()
+def play_games(strategy: Strategy, map: str, game_indices: range, seed: Optional[int] = None,
+               tracer=None, telemetry: Optional[RunTelemetry] = None) -> List[GameStats]:
+    """
+    Play the given games of a run on one reusable game instance.
+
+    With a seed, every game reseeds the random module from its own index, so
+    any subset of a run's games can be played separately and still match.
+    A decision_trace.TraceRecorder passed as tracer records the games' decisions,
+    and every finished game is reported to telemetry if given.
+    """
+    game = BingBoingGame(
+        strategy=strategy, 
+        save_file=None,
+        simulation_mode=True,
+        map=map
+    )
+    if tracer is not None:
+        game.add_observer(tracer)
+    if telemetry is None:
+        return list(game.simulate_many(len(game_indices), seed, game_indices.start))
+
+    strategy_name = strategy.__class__.__name__
+    games = []
+    for stats in game.simulate_many(len(game_indices), seed, game_indices.start):
         games.append(stats)
-    
+        telemetry.record_game(strategy_name, stats.turns_taken)
+    return games
+
+def summarize_games(strategy_name: str, games: List[GameStats]) -> SimulationResults:
+    """Aggregate the statistics of a list of games"""
+    num_games = len(games)
     sorted_games = sorted(games, key=lambda x: (
         x.boing_efficiency,
         x.marks_per_turn,
@@ -42,7 +62,7 @@ def run_simulation(strategy: Strategy, num_games: int = 100) -> SimulationResult
     ), reverse=True)
     
     return SimulationResults(
-        strategy_name=strategy.__class__.__name__,
+        strategy_name=strategy_name,
         games_played=num_games,
         avg_turns=statistics.mean(game.turns_taken for game in games),
         avg_boing_efficiency=statistics.mean(game.boing_efficiency for game in games),
@@ -54,9 +74,16 @@ def run_simulation(strategy: Strategy, num_games: int = 100) -> SimulationResult
         all_games=games
     )
 
-def compare_strategies(num_games: int = 100) -> None:
-    """Run simulations for all strategies and compare results"""
-    strategies = [
+def run_simulation(strategy: Strategy, num_games: int = 100, map: str = './maps/yellow.csv',
+                   seed: Optional[int] = None, tracer=None,
+                   telemetry: Optional[RunTelemetry] = None) -> SimulationResults:
+    """Run multiple games with a given strategy and return aggregated results"""
+    games = play_games(strategy, map, range(num_games), seed, tracer, telemetry)
+    return summarize_games(strategy.__class__.__name__, games)
+
+def default_strategies() -> List[Strategy]:
+    """Return one instance of every strategy to compare"""
+    return [
         DefaultStrategy(),
         AggressiveBoingStrategy(),
         LineCompletionStrategy(),
@@ -65,12 +92,44 @@ def compare_strategies(num_games: int = 100) -> None:
         MaxNumberStrategy(),
         ChainReactionMaximiser()
     ]
+
+def compare_strategies(num_games: int = 100, metrics_file: Optional[str] = "simulation_metrics.prom",
+                       map: str = './maps/yellow.csv', seed: Optional[int] = 0,
+                       cache_dir: Optional[str] = "results_cache") -> None:
+    """
+    Run simulations for all strategies and compare results.
+
+    Progress is shown on a live line while the games run, and Prometheus
+    metrics for the run are rewritten to metrics_file unless it is None.
+    Seeded runs are cached in cache_dir, so only strategies whose code or
+    parameters changed since an earlier comparison are simulated again.
+    """
+    strategies = default_strategies()
+    cache = ResultsCache(cache_dir) if cache_dir is not None and seed is not None else None
+    
+    games_by_strategy = {}
+    keys = {}
+    if cache is not None:
+        for strategy in strategies:
+            keys[strategy] = cache_key(strategy, map, seed, num_games)
+            games = cache.get(keys[strategy])
+            if games is not None:
+                games_by_strategy[strategy] = games
+        print(f"Results cache: {cache.hits} hits, {cache.misses} misses")
     
+    telemetry = RunTelemetry(num_games * (len(strategies) - len(games_by_strategy)), metrics_file)
     results = []
     for strategy in strategies:
-        print(f"\nRunning simulation for {strategy.__class__.__name__}...")
-        result = run_simulation(strategy, num_games)
+        if strategy in games_by_strategy:
+            print(f"\nUsing cached results for {strategy.__class__.__name__}")
+            result = summarize_games(strategy.__class__.__name__, games_by_strategy[strategy])
+        else:
+            print(f"\nRunning simulation for {strategy.__class__.__name__}...")
+            result = run_simulation(strategy, num_games, map, seed, telemetry=telemetry)
+            if cache is not None:
+                cache.put(keys[strategy], result.all_games)
         results.append(result)
+    telemetry.finish()
     
     # Create comparison table
     headers = ["Strategy", "Avg Turns", "Boing Efficiency", "Marks/Turn", "Average Boing Count"]
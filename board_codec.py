@@ -0,0 +1,30 @@
+from typing import Dict, List
+from number_state import NumberState
+
+_DIGITS = {state: str(state.value) for state in NumberState}
+
+def encode_board(game_state: Dict[str, NumberState], numbers: List[int]) -> str:
+    """
+    Encode a board as one digit per number, in the order of `numbers`.
+
+    Each digit is the NumberState value of that number, e.g. '0012' for a
+    board whose third number is a bing and fourth a boing.
+    """
+    return ''.join([_DIGITS[game_state[str(num)]] for num in numbers])
+
+def pack_board(game_state: Dict[str, NumberState], numbers: List[int]) -> bytes:
+    """Pack the state of every number into two bits, in the order of `numbers`"""
+    packed = bytearray((len(numbers) + 3) // 4)
+    for i, num in enumerate(numbers):
+        packed[i >> 2] |= game_state[str(num)].value << ((i & 3) * 2)
+    return bytes(packed)
+
+def unpack_board(packed, numbers: List[int]) -> Dict[str, NumberState]:
+    """Rebuild a game_state dict from bytes made by pack_board"""
+    return {str(num): NumberState((packed[i >> 2] >> ((i & 3) * 2)) & 3) for i, num in enumerate(numbers)}
+
+def decode_board(encoding: str, numbers: List[int]) -> Dict[str, NumberState]:
+    """Rebuild a game_state dict from an encoding made by encode_board"""
+    if len(encoding) != len(numbers):
+        raise ValueError(f"Board encoding has {len(encoding)} digits, expected {len(numbers)}")
+    return {str(num): NumberState(int(digit)) for num, digit in zip(numbers, encoding)}
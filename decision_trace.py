@@ -0,0 +1,185 @@
+import heapq
+import math
+import struct
+import sys
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+from board_codec import pack_board
+from game_events import GameObserver, MarkEvent
+from number_state import NumberState
+
+MAGIC = b"BBTR"
+FORMAT_VERSION = 1
+# Record length, then game index, turn, red, white1, white2, option count, choice, boing count
+_RECORD_HEADER = struct.Struct("<IIHBBBBHH")
+_OPTION = struct.Struct("<Hf")
+_INDEX = struct.Struct("<H")
+
+@dataclass
+class TraceRecord:
+    """One decision read back from a trace file"""
+    game: int
+    turn: int
+    dice: Tuple[int, int, int]
+    board: str
+    options: List[int]
+    scores: Dict[int, float]
+    choice: int
+    boings: List[int]
+
+def _unpack_board(packed: bytes, count: int) -> str:
+    return ''.join(str((packed[i >> 2] >> ((i & 3) * 2)) & 3) for i in range(count))
+
+class TraceRecorder(GameObserver):
+    """
+    Records every decision of sampled games as compact binary records.
+
+    Attach it with BingBoingGame.add_observer. Each record holds the board before the
+    move (two bits per number), the dice, the playable options with the
+    strategy's score for each, the choice and the boings it caused. Numbers
+    are stored as indices into the map's number list written in the file
+    header.
+
+    Sampling keeps the overhead bounded: with sample_every=N only every Nth
+    game is recorded and other games cost one check per turn. With keep_worst=K
+    every game is recorded into memory but only the K games taking the most
+    turns are kept, and they are written when the recorder is closed.
+    """
+
+    def __init__(self, path: str, sample_every: int = 1, keep_worst: Optional[int] = None):
+        self.path = path
+        self.sample_every = sample_every
+        self.keep_worst = keep_worst
+        self.games_seen = 0
+        self.records_written = 0
+        self._file: BinaryIO = open(path, "wb")
+        self._numbers: Optional[List[int]] = None
+        self._index: Dict[int, int] = {}
+        self._sampled = False
+        self._game_buffer = bytearray()
+        self._game_records = 0
+        self._pending: Optional[tuple] = None
+        self._worst: List[Tuple[int, int, bytes, int]] = []
+
+    def _write_header(self, numbers: List[int]) -> None:
+        self._numbers = numbers
+        self._index = {num: i for i, num in enumerate(numbers)}
+        self._file.write(MAGIC + struct.pack("<BI", FORMAT_VERSION, len(numbers)))
+        self._file.write(struct.pack(f"<{len(numbers)}I", *numbers))
+
+    def board_reset(self, game) -> None:
+        """Begin a new game; decides whether its turns are sampled"""
+        if self._numbers is None:
+            self._write_header(game.compiled.numbers)
+        self._finish_buffer(None)
+        self.games_seen += 1
+        self._sampled = self.keep_worst is not None or (self.games_seen - 1) % self.sample_every == 0
+
+    def move_chosen(self, game, dice: Tuple[int, int, int], playable_options: List[int], choice: int) -> None:
+        """Capture the board and option scores before the chosen number is marked"""
+        if not self._sampled:
+            return
+        scores = game.strategy.score_options(set(playable_options), game.game_state, game.OPTIONS)
+        self._pending = (game.turns_taken + 1, dice, pack_board(game.game_state, self._numbers),
+                         playable_options, scores, choice)
+
+    def turn_finished(self, game, dice: Tuple[int, int, int], events: List[MarkEvent]) -> None:
+        """Complete the pending record with the cascade caused by the move"""
+        if self._pending is not None:
+            self._record_outcome(events)
+        if game.game_won:
+            self.finish_game(game)
+
+    def _record_outcome(self, events: List[MarkEvent]) -> None:
+        turn, dice, board, playable_options, scores, choice = self._pending
+        self._pending = None
+        index = self._index
+        boings = [event.number for event in events if event.mark_type == NumberState.boing]
+
+        body = bytearray(board)
+        for num in playable_options:
+            body += _OPTION.pack(index[num], scores.get(num, math.nan))
+        for num in boings:
+            body += _INDEX.pack(index[num])
+        header = _RECORD_HEADER.pack(_RECORD_HEADER.size - 4 + len(body), self.games_seen, turn,
+                                     dice[0], dice[1], dice[2], len(playable_options), index[choice], len(boings))
+        self._game_buffer += header
+        self._game_buffer += body
+        self._game_records += 1
+
+    def finish_game(self, game) -> None:
+        """End the current game, writing or ranking its records"""
+        self._finish_buffer(game.turns_taken)
+        self._sampled = False
+
+    def _finish_buffer(self, turns_taken: Optional[int]) -> None:
+        self._pending = None
+        if not self._game_buffer:
+            return
+        if self.keep_worst is None:
+            self._file.write(self._game_buffer)
+            self.records_written += self._game_records
+        elif turns_taken is not None:
+            entry = (turns_taken, -self.games_seen, bytes(self._game_buffer), self._game_records)
+            if len(self._worst) < self.keep_worst:
+                heapq.heappush(self._worst, entry)
+            elif entry > self._worst[0]:
+                heapq.heapreplace(self._worst, entry)
+        self._game_buffer = bytearray()
+        self._game_records = 0
+
+    def close(self) -> None:
+        self._finish_buffer(None)
+        # The worst games are written in the order they were played
+        for _, _, data, records in sorted(self._worst, key=lambda entry: -entry[1]):
+            self._file.write(data)
+            self.records_written += records
+        self._worst = []
+        self._file.close()
+
+    def __enter__(self) -> 'TraceRecorder':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+def iter_trace(path: str) -> Iterator[TraceRecord]:
+    """Stream the records of a trace file one at a time"""
+    with open(path, "rb") as file:
+        if file.read(4) != MAGIC:
+            raise ValueError(f"{path} is not a decision trace")
+        version, count = struct.unpack("<BI", file.read(5))
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported trace version {version}")
+        numbers = list(struct.unpack(f"<{count}I", file.read(4 * count)))
+        board_size = (count + 3) // 4
+
+        while True:
+            head = file.read(_RECORD_HEADER.size)
+            if len(head) < _RECORD_HEADER.size:
+                return
+            length, game, turn, red, white1, white2, n_options, choice, n_boings = _RECORD_HEADER.unpack(head)
+            body = file.read(length - (_RECORD_HEADER.size - 4))
+            offset = board_size
+            options, scores = [], {}
+            for _ in range(n_options):
+                option, score = _OPTION.unpack_from(body, offset)
+                offset += _OPTION.size
+                options.append(numbers[option])
+                if not math.isnan(score):
+                    scores[numbers[option]] = score
+            boings = [numbers[_INDEX.unpack_from(body, offset + i * _INDEX.size)[0]] for i in range(n_boings)]
+            yield TraceRecord(game, turn, (red, white1, white2), _unpack_board(body[:board_size], count),
+                              options, scores, numbers[choice], boings)
+
+if __name__ == "__main__":
+    games = set()
+    decisions = 0
+    options = 0
+    for record in iter_trace(sys.argv[1]):
+        games.add(record.game)
+        decisions += 1
+        options += len(record.options)
+    print(f"Games: {len(games)}")
+    print(f"Decisions: {decisions}")
+    print(f"Average playable options: {options / decisions if decisions else 0:.2f}")
@@ -1,6 +1,7 @@
 from strategy_interface import Strategy
 from typing import List, Dict, Set, Tuple
 from number_state import NumberState
+from map import CompiledMap
 
 class DefaultStrategy(Strategy):
     """Default strategy implementation focusing on maximizing boings"""
@@ -63,19 +64,17 @@ class DefaultStrategy(Strategy):
             A score indicating how likely this number is to create boings
         """
         boing_potential = 0
-        str_number = str(number)
         
-        for option in options:
-            if number in option:
-                marked_count = sum(1 for num in option 
-                                 if game_state[str(num)] != NumberState.not_crossed)
-                                 
-                # High potential if this would leave only one number uncrossed
-                if marked_count == len(option) - 2:
-                    boing_potential += 2
-                # Some potential if line already has some marked numbers
-                elif marked_count > 0:
-                    boing_potential += 1
+        for option in CompiledMap.for_lines(options).lines_with(number):
+            marked_count = sum(1 for num in option 
+                             if game_state[str(num)] != NumberState.not_crossed)
+                             
+            # High potential if this would leave only one number uncrossed
+            if marked_count == len(option) - 2:
+                boing_potential += 2
+            # Some potential if line already has some marked numbers
+            elif marked_count > 0:
+                boing_potential += 1
                     
         return boing_potential
 
@@ -96,12 +95,8 @@ class DefaultStrategy(Strategy):
         Returns:
             The minimum count of uncrossed numbers in any line containing this number
         """
-        uncrossed_counts = []
-        
-        for option in options:
-            if number in option:
-                uncrossed_count = self._count_uncrossed_numbers(option, game_state)
-                uncrossed_counts.append(uncrossed_count)
+        uncrossed_counts = [self._count_uncrossed_numbers(option, game_state)
+                            for option in CompiledMap.for_lines(options).lines_with(number)]
                 
         return min(uncrossed_counts) if uncrossed_counts else float('inf')
 
@@ -123,6 +118,31 @@ class DefaultStrategy(Strategy):
         return sum(1 for num in option 
                   if game_state[str(num)] == NumberState.not_crossed)
 
+    def score_options(
+        self,
+        playable_options: Set[int],
+        game_state: Dict[str, NumberState],
+        options: List[List[int]]
+    ) -> Dict[int, float]:
+        """
+        Score each option in the order used by select_best_option.
+        
+        Args:
+            playable_options: Set of valid numbers that can be marked
+            game_state: Current state of all numbers in the game
+            options: List of all valid number combinations (lines)
+            
+        Returns:
+            Dict of number to score, where fewer uncrossed numbers in the
+            emptiest line dominates and boing potential breaks ties
+        """
+        scores = {}
+        for number in playable_options:
+            boing_potential = self._check_boing_potential(number, game_state, options)
+            min_uncrossed_count = self._get_min_uncrossed_line_count(number, game_state, options)
+            scores[number] = -min_uncrossed_count * 100 + boing_potential
+        return scores
+
     def explain_selection(
         self,
         playable_options: Set[int],
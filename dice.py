@@ -0,0 +1,77 @@
+from functools import lru_cache
+from typing import AbstractSet, Dict, FrozenSet, Tuple
+
+DICE_FACES = range(1, 7)
+
+@lru_cache(maxsize=None)
+def dice_outcomes(red: int, white1: int, white2: int) -> Dict[int, Tuple[str, ...]]:
+    """
+    Return every number the dice can produce, mapped to the formulas producing it.
+
+    There are only 216 dice rolls, so results are cached; callers must not
+    mutate the returned dict.
+    """
+    option_formulas: Dict[int, Tuple[str, ...]] = {}
+
+    def add(result: int, formula: str) -> None:
+        option_formulas[result] = option_formulas.get(result, ()) + (formula,)
+
+    for white in [white1, white2]:
+        # Addition
+        add(red + white, f"{red} + {white}")
+
+        # Subtraction (both ways)
+        if red - white > 0:
+            add(red - white, f"{red} - {white}")
+        if white - red > 0:
+            add(white - red, f"{white} - {red}")
+
+        # Multiplication
+        add(red * white, f"{red} × {white}")
+
+        # Division (both ways)
+        if white != 0 and red % white == 0:
+            add(red // white, f"{red} ÷ {white}")
+        if red != 0 and white % red == 0:
+            add(white // red, f"{white} ÷ {red}")
+
+        # Exponents (both ways)
+        if red ** white <= 1000:  # Avoid huge numbers
+            add(red ** white, f"{red}^{white}")
+        if white ** red <= 1000:  # Avoid huge numbers
+            add(white ** red, f"{white}^{red}")
+
+        # Concatenation (both ways)
+        add(int(f"{red}{white}"), f"{red}{white} (concat)")
+        add(int(f"{white}{red}"), f"{white}{red} (concat)")
+
+    return option_formulas
+
+@lru_cache(maxsize=None)
+def reachable_numbers() -> FrozenSet[int]:
+    """Return every number some roll of the dice can produce"""
+    return frozenset(
+        num
+        for red in DICE_FACES
+        for white1 in DICE_FACES
+        for white2 in DICE_FACES
+        for num in dice_outcomes(red, white1, white2)
+    )
+
+def playable_sets(uncrossed: AbstractSet[int]) -> Dict[Tuple[int, ...], int]:
+    """
+    Group the 216 dice rolls by the numbers they make playable on a board.
+
+    Returns:
+        The number of rolls producing each distinct non-empty sorted set of
+        playable numbers; rolls with nothing playable are left out
+    """
+    counts: Dict[Tuple[int, ...], int] = {}
+    for red in DICE_FACES:
+        for white1 in DICE_FACES:
+            # Swapping the white dice produces the same options
+            for white2 in range(white1, 7):
+                playable = tuple(sorted(num for num in dice_outcomes(red, white1, white2) if num in uncrossed))
+                if playable:
+                    counts[playable] = counts.get(playable, 0) + (1 if white1 == white2 else 2)
+    return counts
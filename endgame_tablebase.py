@@ -0,0 +1,211 @@
+import argparse
+import math
+import struct
+import time
+from typing import Dict, List, Optional, Set, Tuple
+from bing_boing_cli import get_available_strategies
+from dice import DICE_FACES, dice_outcomes
+from map import CompiledMap, FileMap
+from mmap_table import MappedMoveTableStrategy, lines_digest, write_table
+from number_state import NumberState
+
+_EXPECTED = struct.Struct("<d")
+_NO_MOVE = 0xFF
+
+class EndgameBoard:
+    """
+    A map's lines as bitmasks over its numbers, for solving endgame positions.
+
+    A position is the bitmask of uncrossed numbers once all boings have
+    resolved, so every line holds zero or at least two uncrossed cells. The
+    dice rolls are grouped into classes by which of the map's numbers they
+    produce, weighted by how many of the 216 rolls fall in each class.
+    """
+
+    def __init__(self, compiled: CompiledMap):
+        self.numbers = compiled.numbers
+        if len(self.numbers) > 64:
+            raise ValueError(f"Endgame tablebases support at most 64 numbers, the map has {len(self.numbers)}")
+        index = {num: i for i, num in enumerate(self.numbers)}
+        self.line_members: List[List[Tuple[int, int]]] = []
+        for line in compiled.lines:
+            counts: Dict[int, int] = {}
+            for num in line:
+                counts[index[num]] = counts.get(index[num], 0) + 1
+            self.line_members.append(sorted(counts.items()))
+        self.lines_of: List[List[int]] = [[] for _ in self.numbers]
+        for line_index, members in enumerate(self.line_members):
+            for bit, _ in members:
+                self.lines_of[bit].append(line_index)
+
+        weights: Dict[int, int] = {}
+        for red in DICE_FACES:
+            for white1 in DICE_FACES:
+                for white2 in DICE_FACES:
+                    mask = 0
+                    for num in dice_outcomes(red, white1, white2):
+                        if num in index:
+                            mask |= 1 << index[num]
+                    if mask:
+                        weights[mask] = weights.get(mask, 0) + 1
+        self.roll_classes: List[Tuple[int, int]] = sorted(weights.items())
+
+    def after_move(self, mask: int, bit: int) -> int:
+        """Cross a number and resolve the boings it causes, as BingBoingGame.mark_number does"""
+        mask &= ~(1 << bit)
+        pending = list(self.lines_of[bit])
+        while pending:
+            line_index = pending.pop()
+            remaining = [(member, occurrences) for member, occurrences in self.line_members[line_index] if mask >> member & 1]
+            if sum(occurrences for _, occurrences in remaining) == 1:
+                boinged = remaining[0][0]
+                mask &= ~(1 << boinged)
+                pending.extend(self.lines_of[boinged])
+        return mask
+
+    def positions(self, max_uncrossed: int) -> List[int]:
+        """Enumerate every resolved position with at most max_uncrossed uncrossed numbers"""
+        count = len(self.numbers)
+        line_counts = [0] * len(self.line_members)
+        # Lines are checked once their last member has been decided
+        closing: List[List[int]] = [[] for _ in range(count)]
+        for line_index, members in enumerate(self.line_members):
+            closing[members[-1][0]].append(line_index)
+        occurrences = [dict(members) for members in self.line_members]
+        found: List[int] = []
+
+        def visit(bit: int, mask: int, size: int) -> None:
+            if bit == count:
+                found.append(mask)
+                return
+            if all(line_counts[line_index] != 1 for line_index in closing[bit]):
+                visit(bit + 1, mask, size)
+            if size < max_uncrossed:
+                for line_index in self.lines_of[bit]:
+                    line_counts[line_index] += occurrences[line_index][bit]
+                if all(line_counts[line_index] != 1 for line_index in closing[bit]):
+                    visit(bit + 1, mask | 1 << bit, size + 1)
+                for line_index in self.lines_of[bit]:
+                    line_counts[line_index] -= occurrences[line_index][bit]
+
+        visit(0, 0, 0)
+        return sorted(found, key=lambda mask: bin(mask).count("1"))
+
+def solve_endgame(board: EndgameBoard, max_uncrossed: int) -> Dict[int, Tuple[float, List[int]]]:
+    """
+    Compute the exact expected turns to finish every endgame position.
+
+    Positions are solved from the fewest uncrossed numbers up, as every move
+    leads to a position with fewer. For each roll class the best move is the
+    playable number whose resulting position has the lowest expected turns:
+
+        E(position) = 1 + sum(p(roll) * min E(after move)) / p(playable roll)
+
+    Rolls with no playable number do not use a turn, so they are conditioned
+    away; a position no roll can progress from is infinite.
+
+    Returns:
+        For each position, its expected turns and the bit of the best number
+        for every roll class (None where the class has nothing playable)
+    """
+    solved: Dict[int, Tuple[float, List[int]]] = {0: (0.0, [None] * len(board.roll_classes))}
+    for mask in board.positions(max_uncrossed):
+        if mask == 0:
+            continue
+        bits = [bit for bit in range(len(board.numbers)) if mask >> bit & 1]
+        # Ties go to the lower number so the table is reproducible
+        ranked = sorted((solved[board.after_move(mask, bit)][0], bit) for bit in bits)
+        total_weight = 0
+        weighted = 0.0
+        moves: List[Optional[int]] = []
+        for roll_mask, weight in board.roll_classes:
+            playable = mask & roll_mask
+            if not playable:
+                moves.append(None)
+                continue
+            expected, bit = next((expected, bit) for expected, bit in ranked if playable >> bit & 1)
+            moves.append(bit)
+            total_weight += weight
+            weighted += weight * expected
+        expected = 1 + weighted / total_weight if total_weight else math.inf
+        solved[mask] = (expected, moves)
+    return solved
+
+def build_tablebase(map_path: str, max_uncrossed: int, out_path: str) -> int:
+    """
+    Solve a map's endgame and store it as a memory-mappable table.
+
+    Keys are position bitmasks; each value holds the expected turns followed
+    by one byte per roll class with the index of the best number.
+
+    Returns:
+        The number of positions written
+    """
+    compiled = FileMap(map_path).compile()
+    board = EndgameBoard(compiled)
+    solved = solve_endgame(board, max_uncrossed)
+    entries = {
+        mask: _EXPECTED.pack(expected) + bytes(_NO_MOVE if bit is None else bit for bit in moves)
+        for mask, (expected, moves) in solved.items()
+    }
+    write_table(out_path, entries, _EXPECTED.size + len(board.roll_classes), {
+        "kind": "endgame-tablebase",
+        "max_uncrossed": max_uncrossed,
+        "lines": lines_digest(compiled.lines),
+        "numbers": board.numbers,
+        "roll_classes": [roll_mask for roll_mask, _ in board.roll_classes]
+    })
+    return len(entries)
+
+class TablebaseStrategy(MappedMoveTableStrategy):
+    """
+    Plays perfect endgame moves from a tablebase, falling back to another strategy.
+
+    Once no more than the tablebase's max_uncrossed numbers are left, the move
+    minimising the expected number of turns to finish is looked up; earlier
+    positions use the fallback strategy.
+    """
+
+    def _table_move(self, playable_options: Set[int], game_state: Dict[str, NumberState]) -> Optional[Tuple[int, str]]:
+        uncrossed = [num for num, state in game_state.items() if state is NumberState.not_crossed]
+        if len(uncrossed) > self._table.metadata["max_uncrossed"]:
+            return None
+        position = sum(1 << self._index[int(num)] for num in uncrossed)
+        value = self._table.get(position)
+        if value is None:
+            return None
+        # Any roll class producing exactly the playable numbers has the same best move
+        playable = sum(1 << self._index[num] for num in playable_options)
+        for roll_class, roll_mask in enumerate(self._table.metadata["roll_classes"]):
+            if position & roll_mask == playable:
+                move = value[_EXPECTED.size + roll_class]
+                if move == _NO_MOVE:
+                    return None
+                expected = _EXPECTED.unpack_from(value)[0]
+                return (self._numbers[move],
+                        f"Endgame tablebase move; {expected:.2f} turns expected to finish before this move.")
+        return None
+
+def main():
+    strategies = {cls.__name__: cls for cls, _ in get_available_strategies().values()}
+    parser = argparse.ArgumentParser(description="Solve the endgame of a map into a tablebase")
+    parser.add_argument("--map", default="./maps/blue.csv")
+    parser.add_argument("--max-uncrossed", type=int, default=12, help="Largest number of uncrossed numbers to solve")
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--compare", metavar="STRATEGY", choices=sorted(strategies),
+                        help="Simulate a strategy with and without the tablebase afterwards")
+    parser.add_argument("--games", type=int, default=200)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count = build_tablebase(args.map, args.max_uncrossed, args.out)
+    print(f"Wrote {count} positions to {args.out} in {time.perf_counter() - start:.1f}s")
+
+    if args.compare:
+        from bing_boing_simulation_runner import run_simulation
+        plain = run_simulation(strategies[args.compare](), args.games, args.map, seed=0)
+        solved = run_simulation(TablebaseStrategy(args.out, strategies[args.compare]()), args.games, args.map, seed=0)
+        print(f"{args.compare}: {plain.avg_turns:.3f} average turns, with tablebase: {solved.avg_turns:.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+from typing import List, NamedTuple, Tuple
+from number_state import NumberState
+
+class MarkEvent(NamedTuple):
+    """
+    One number changing state.
+
+    Every bing starts a new cascade; the boings it sets off share its
+    cascade_id, which increases over the game.
+    """
+    number: int
+    mark_type: NumberState
+    turn: int
+    cascade_id: int
+
+class GameObserver:
+    """
+    Base class for objects following a game through BingBoingGame.add_observer.
+
+    Observers are told when the board is replaced wholesale, after which they
+    should resynchronise from the game, about the move chosen each turn
+    before it is played, about every mark as it happens, and when a turn is
+    complete. All methods do nothing by default.
+    """
+
+    def board_reset(self, game) -> None:
+        """The game was reset or restored; its board must be read in full"""
+
+    def move_chosen(self, game, dice: Tuple[int, int, int], playable_options: List[int], choice: int) -> None:
+        """The strategy picked a number; the board is still as before the move"""
+
+    def number_marked(self, event: MarkEvent) -> None:
+        """A number was marked; called again for each boing of the cascade"""
+
+    def turn_finished(self, game, dice: Tuple[int, int, int], events: List[MarkEvent]) -> None:
+        """A turn was played, producing the given marks"""
@@ -0,0 +1,117 @@
+import json
+import os
+from typing import Dict, List, Tuple, Union
+
+class GameJournal:
+    """
+    Append-only save format for a game in progress.
+
+    The save file holds a compacted snapshot of the full game state and is only
+    ever replaced atomically. Each turn appends one small record to a sibling
+    journal file, so the bytes written per turn do not depend on the board size.
+    Every `snapshot_interval` turns the journal is folded into a new snapshot.
+    """
+
+    def __init__(self, save_file: str, snapshot_interval: int = 25):
+        self.save_file = save_file
+        self.journal_file = save_file + ".journal"
+        self.snapshot_interval = snapshot_interval
+        self._records_since_snapshot = 0
+
+    def exists(self) -> bool:
+        """Check whether a saved game is available"""
+        return os.path.exists(self.save_file)
+
+    def write_snapshot(self, game_state: Dict[str, int], turns_taken: int, game_won: bool) -> None:
+        """Atomically replace the snapshot and discard the journal it supersedes"""
+        save_data = {
+            'game_state': game_state,
+            'turns_taken': turns_taken,
+            'game_won': game_won
+        }
+        records = self._read_records()
+        if records and records[-1]['t'] > turns_taken:
+            # A snapshot moving the game backwards, such as a new game, would
+            # have the old game's later turns replayed onto it after a crash,
+            # so those records are discarded first.
+            self._truncate_journal()
+        write_atomic(self.save_file, json.dumps(save_data, separators=(',', ':')))
+        # The snapshot records the turn it covers, so a crash before the journal
+        # is truncated only leaves stale records that replay will skip.
+        self._truncate_journal()
+        self._records_since_snapshot = 0
+
+    def append_turn(self, turn: int, dice: Tuple[int, int, int], number: int,
+                    boings: List[int], game_won: bool) -> bool:
+        """
+        Append the record for a completed turn.
+
+        Returns:
+            True when the snapshot interval has been reached and the caller
+            should compact the journal with `write_snapshot`
+        """
+        record = {'t': turn, 'd': list(dice), 'n': number, 'b': boings}
+        if game_won:
+            record['w'] = 1
+        line = json.dumps(record, separators=(',', ':')) + "\n"
+        with open(self.journal_file, "a") as file:
+            file.write(line)
+        self._records_since_snapshot += 1
+        return self._records_since_snapshot >= self.snapshot_interval
+
+    def load(self) -> Tuple[Dict[str, int], int, bool, List[dict]]:
+        """
+        Load the snapshot and the journal records written after it.
+
+        Returns:
+            Tuple of (game_state, turns_taken, game_won, records), where records
+            are the turn records newer than the snapshot in the order written
+        """
+        with open(self.save_file, "r") as file:
+            save_data = json.load(file)
+        turns_taken = save_data.get('turns_taken', 0)
+        records = [record for record in self._read_records() if record['t'] > turns_taken]
+        self._records_since_snapshot = len(records)
+        return save_data['game_state'], turns_taken, save_data.get('game_won', False), records
+
+    def _read_records(self) -> List[dict]:
+        """
+        Read the journal records, stopping at a torn trailing write.
+
+        A torn tail is cut off the file, so records appended afterwards start
+        on a fresh line instead of being glued onto the partial one.
+        """
+        if not os.path.exists(self.journal_file):
+            return []
+        records = []
+        valid_length = 0
+        with open(self.journal_file, "rb") as file:
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break
+                valid_length += len(line)
+            torn = file.seek(0, os.SEEK_END) > valid_length
+        if torn:
+            with open(self.journal_file, "r+b") as file:
+                file.truncate(valid_length)
+                file.flush()
+                os.fsync(file.fileno())
+        return records
+
+    def _truncate_journal(self) -> None:
+        with open(self.journal_file, "w") as file:
+            file.flush()
+            os.fsync(file.fileno())
+
+def write_atomic(path: str, content: Union[str, bytes], mode: str = "w") -> None:
+    """Write a file through a temporary sibling so readers never see a partial file"""
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, mode) as file:
+        file.write(content)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from typing import Dict
 from number_state import NumberState
 
@@ -12,4 +12,31 @@ class GameStats:
     boing_efficiency: float
     marks_per_turn: float
     won: bool
-    final_state: Dict[str, NumberState]
\ No newline at end of file
+    final_state: Dict[str, NumberState]
+
+    @classmethod
+    def from_counts(cls, turns_taken: int, bing_count: int, boing_count: int, won: bool,
+                    final_state: Dict[str, NumberState]) -> 'GameStats':
+        """Build statistics from a game's mark counts, deriving the ratios"""
+        total_marked = bing_count + boing_count
+        return cls(
+            turns_taken=turns_taken,
+            bing_count=bing_count,
+            boing_count=boing_count,
+            total_marked=total_marked,
+            boing_efficiency=boing_count / total_marked * 100 if total_marked > 0 else 0,
+            marks_per_turn=total_marked / turns_taken if turns_taken > 0 else 0,
+            won=won,
+            final_state=final_state
+        )
+
+    def to_dict(self) -> dict:
+        """Return the statistics as plain JSON-serializable values"""
+        data = asdict(self)
+        data['final_state'] = {k: v.value for k, v in self.final_state.items()}
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'GameStats':
+        """Rebuild statistics written by to_dict"""
+        return cls(**{**data, 'final_state': {k: NumberState(v) for k, v in data['final_state'].items()}})
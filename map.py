@@ -1,6 +1,20 @@
+import os
+import random
 from tabulate import tabulate
 from number_state import NumberState
-from typing import Dict, List
+from dice import reachable_numbers
+from typing import Dict, List, Optional, Sequence, Tuple
+
+MAPS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "maps")
+
+def bundled_map_path(map_name: str) -> str:
+    """Return the file of a map shipped in the maps directory, e.g. 'blue'"""
+    if not isinstance(map_name, str) or not map_name.isalnum():
+        raise ValueError(f"Unknown map: {map_name}")
+    map_path = os.path.join(MAPS_DIR, f"{map_name}.csv")
+    if not os.path.exists(map_path):
+        raise ValueError(f"Unknown map: {map_name}")
+    return map_path
 
 class Tile:
     def __init__(self, x: int, y: int, number: int):
@@ -16,18 +30,20 @@ class Map:
         self.width = width
         self.height = height
         self.tiles = initial_state if initial_state else {}
+        self._compiled: Optional['CompiledMap'] = None
 
     def get_tile(self, x: int, y: int):
         return self.tiles.get((x, y))
 
     def set_tile(self, x: int, y: int, number: int):
         self.tiles[(x, y)] = Tile(x, y, number)
+        self._compiled = None
 
-    def display_map(self, game_state: Dict[str, NumberState]):
+    def display_map(self, game_state: Dict[str, NumberState], max_rows: int = 40, max_cols: int = 40):
         grid = []
-        for y in range(self.height):
+        for y in range(min(self.height, max_rows)):
             row = []
-            for x in range(self.width):
+            for x in range(min(self.width, max_cols)):
                 tile = self.tiles.get((x, y))
                 if tile:
                     num_str = str(tile.number)
@@ -42,6 +58,24 @@ class Map:
                     row.append(".....")
             grid.append(row)
         print(tabulate(grid, tablefmt="grid"))
+        if self.height > max_rows or self.width > max_cols:
+            print(f"(showing {len(grid)} of {self.height} rows, {len(grid[0]) if grid else 0} of {self.width} columns)")
+
+    def compile(self) -> 'CompiledMap':
+        """Return the line tables used by the engine and strategies, built once per map"""
+        if self._compiled is None:
+            self._compiled = CompiledMap(self.find_consecutive_coordinates())
+        return self._compiled
+
+    def save_to_file(self, file_path: str) -> None:
+        """Write the map in the CSV layout read by FileMap"""
+        with open(file_path, 'w') as file:
+            for y in range(self.height):
+                row = []
+                for x in range(self.width):
+                    tile = self.tiles.get((x, y))
+                    row.append(str(tile.number) if tile else '.')
+                file.write(','.join(row) + '\n')
 
     def find_consecutive_coordinates(self) -> List[List[int]]:
         consecutive_groups = []
@@ -94,3 +128,91 @@ class FileMap(Map):
                         initial_state[(x, y)] = Tile(x, y, int(cell))
                 max_width = max(max_width, len(row))
         return initial_state, max_width, y + 1
+
+
+class ProceduralMap(Map):
+    """
+    Randomly generated map made of rectangular blocks of numbers, like the printed maps.
+
+    Blocks are laid out in bands separated by empty rows and columns, so every
+    row and column of a block forms one line. By default numbers are drawn from
+    the values the dice can produce, which keeps every generated board winnable;
+    with reachable_only=False any number in the range may appear.
+    """
+
+    def __init__(self, width: int, height: int, min_line: int = 3, max_line: int = 4,
+                 number_range: Tuple[int, int] = (1, 66), density: float = 1.0,
+                 reachable_only: bool = True, seed: Optional[int] = None):
+        if min_line < 2 or max_line < min_line:
+            raise ValueError("Line lengths must satisfy 2 <= min_line <= max_line")
+        low, high = number_range
+        if reachable_only:
+            numbers = [num for num in sorted(reachable_numbers()) if low <= num <= high]
+        else:
+            numbers = range(low, high + 1)
+        if not numbers:
+            raise ValueError(f"No usable numbers in range {number_range}")
+        super().__init__(width, height)
+        rng = random.Random(seed)
+
+        y = 0
+        while y < height:
+            band_height = min(rng.randint(min_line, max_line), height - y)
+            x = 0
+            while x < width:
+                block_width = min(rng.randint(min_line, max_line), width - x)
+                if rng.random() < density:
+                    self._place_block(rng, numbers, x, y, block_width, band_height)
+                x += block_width + 1
+            y += band_height + 1
+
+    def _place_block(self, rng: random.Random, numbers: Sequence[int], x0: int, y0: int, width: int, height: int) -> None:
+        cells = width * height
+        # Avoid repeating a number inside a block whenever the range allows it
+        values = rng.sample(numbers, cells) if cells <= len(numbers) else [rng.choice(numbers) for _ in range(cells)]
+        for i, number in enumerate(values):
+            self.set_tile(x0 + i % width, y0 + i // width, number)
+
+class CompiledMap:
+    """
+    Lookup tables derived from a map's lines.
+
+    Built once per map so that propagation and strategies only visit the lines
+    containing a given number instead of scanning every line on the board.
+    """
+    _by_lines: Dict[int, 'CompiledMap'] = {}
+    _cache_size = 64
+
+    def __init__(self, lines: List[List[int]]):
+        self.lines = lines
+        self.numbers: List[int] = sorted({num for line in lines for num in line})
+        # number -> [(line index, occurrences of the number in that line)]
+        self.lines_by_number: Dict[int, List[Tuple[int, int]]] = {}
+        # number -> lines containing it, in board order
+        self.lines_with_number: Dict[int, List[List[int]]] = {}
+        for line_index, line in enumerate(lines):
+            occurrences: Dict[int, int] = {}
+            for num in line:
+                occurrences[num] = occurrences.get(num, 0) + 1
+            for num, count in occurrences.items():
+                self.lines_by_number.setdefault(num, []).append((line_index, count))
+                self.lines_with_number.setdefault(num, []).append(line)
+        self._register()
+
+    def lines_with(self, number: int) -> List[List[int]]:
+        """Return the lines containing a number"""
+        return self.lines_with_number.get(number, [])
+
+    def _register(self) -> None:
+        cache = CompiledMap._by_lines
+        if len(cache) >= CompiledMap._cache_size:
+            del cache[next(iter(cache))]
+        cache[id(self.lines)] = self
+
+    @classmethod
+    def for_lines(cls, lines: List[List[int]]) -> 'CompiledMap':
+        """Return the compiled tables for a list of lines, building them on first use"""
+        compiled = cls._by_lines.get(id(lines))
+        if compiled is None or compiled.lines is not lines:
+            compiled = cls(lines)
+        return compiled
@@ -0,0 +1,71 @@
+import random
+import time
+from typing import List, Tuple
+from tabulate import tabulate
+from bing_boing_game import BingBoingGame
+from map import ProceduralMap
+from strategies import BalancedStrategy
+from strategy_interface import Strategy
+
+def benchmark_board(width: int, height: int, strategy: Strategy, num_games: int,
+                    turns_per_game: int, seed: int = 0) -> List:
+    """
+    Play turns on a generated board and return one row of timing results.
+
+    Boards only hold numbers the dice can produce, so every game can be won.
+    Each game is capped at turns_per_game played turns; rolls with nothing
+    playable are not counted, and nothing is saved during the timed loop.
+    """
+    board = ProceduralMap(width, height, seed=seed)
+
+    start = time.perf_counter()
+    compiled = board.compile()
+    compile_time = time.perf_counter() - start
+
+    random.seed(seed)
+    turns = 0
+    marked = 0
+    play_time = 0.0
+    for _ in range(num_games):
+        game = BingBoingGame(
+            strategy=strategy,
+            save_file=None,
+            simulation_mode=True,
+            map=board
+        )
+        game.new_game()
+        played = 0
+        start = time.perf_counter()
+        while played < turns_per_game and not game.game_won:
+            if game.play_turn(*game.roll_dice()):
+                played += 1
+        play_time += time.perf_counter() - start
+        turns += played
+        marked += game.collect_stats().total_marked
+
+    return [
+        f"{width}x{height}",
+        len(board.tiles),
+        len(compiled.lines),
+        f"{compile_time * 1000:.1f}",
+        turns,
+        f"{marked / num_games:.1f}",
+        f"{play_time / turns * 1000:.3f}"
+    ]
+
+def run_benchmark(sizes: List[Tuple[int, int]], strategy: Strategy, num_games: int = 20, turns_per_game: int = 50) -> None:
+    """Report time per turn as the generated board grows"""
+    headers = ["Board", "Cells", "Lines", "Compile (ms)", "Turns", "Marked/Game", "Time/Turn (ms)"]
+    rows = []
+    for width, height in sizes:
+        print(f"Benchmarking {width}x{height} board...")
+        rows.append(benchmark_board(width, height, strategy, num_games, turns_per_game))
+
+    print(f"\nScaling benchmark ({strategy.__class__.__name__}, {num_games} games of up to {turns_per_game} turns per board):")
+    print(tabulate(rows, headers=headers, tablefmt="grid"))
+
+if __name__ == "__main__":
+    run_benchmark(
+        sizes=[(10, 9), (50, 50), (100, 100), (200, 200), (300, 300)],
+        strategy=BalancedStrategy()
+    )
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import mmap
+import struct
+from abc import abstractmethod
+from typing import Dict, List, Optional, Set, Tuple
+from game_journal import write_atomic
+from map import CompiledMap
+from number_state import NumberState
+from strategy_interface import Strategy
+
+MAGIC = b"BBMT"
+FORMAT_VERSION = 1
+# Magic, version, value size, metadata length
+_HEADER = struct.Struct("<4sBHI")
+_COUNT = struct.Struct("<Q")
+_KEY = struct.Struct("<Q")
+
+def lines_digest(lines: List[List[int]]) -> str:
+    """Fingerprint of a map's lines, used to check a table matches the board it is used on"""
+    return hashlib.sha256(repr(lines).encode()).hexdigest()[:16]
+
+def write_table(path: str, entries: Dict[int, bytes], value_size: int, metadata: dict) -> None:
+    """
+    Write a lookup table of 64-bit keys to fixed-size values.
+
+    Records are sorted by key so MappedTable can binary search them in place.
+    The JSON metadata describes what the table was built from.
+    """
+    meta = json.dumps(metadata, separators=(',', ':')).encode()
+    parts = [_HEADER.pack(MAGIC, FORMAT_VERSION, value_size, len(meta)), meta, _COUNT.pack(len(entries))]
+    for key in sorted(entries):
+        value = entries[key]
+        if len(value) != value_size:
+            raise ValueError(f"Value for key {key} has {len(value)} bytes, expected {value_size}")
+        parts.append(_KEY.pack(key))
+        parts.append(value)
+    write_atomic(path, b"".join(parts), mode="wb")
+
+class MappedTable:
+    """
+    Read-only view of a table written by write_table.
+
+    The file is memory mapped, so opening it is cheap regardless of its size,
+    pages are loaded on demand and shared between processes reading it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.value_size, meta_length = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a lookup table")
+        offset = _HEADER.size
+        self.metadata = json.loads(self._map[offset:offset + meta_length])
+        offset += meta_length
+        self.count = _COUNT.unpack_from(self._map, offset)[0]
+        self._records = offset + _COUNT.size
+        self._record_size = _KEY.size + self.value_size
+
+    def __len__(self) -> int:
+        return self.count
+
+    def get(self, key: int) -> Optional[bytes]:
+        """Return the value stored for a key, or None"""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            position = self._records + middle * self._record_size
+            found = _KEY.unpack_from(self._map, position)[0]
+            if found == key:
+                start = position + _KEY.size
+                return self._map[start:start + self.value_size]
+            if found < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def close(self) -> None:
+        self._map.close()
+
+class MappedMoveTableStrategy(Strategy):
+    """
+    Base class for strategies playing moves from a table built for one map.
+
+    The table's metadata must hold the digest of the map's lines and its
+    sorted numbers. It is memory mapped on first use, so many games or
+    processes can share it cheaply. Subclasses implement _table_move; boards
+    from other maps, and positions the table has no valid move for, use the
+    fallback strategy.
+    """
+
+    def __init__(self, table_path: str, fallback: Strategy):
+        self.table_path = table_path
+        self.fallback = fallback
+        self.hits = 0
+        self.misses = 0
+        self._table: Optional[MappedTable] = None
+        self._numbers: List[int] = []
+        self._index: Dict[int, int] = {}
+        self._checked_lines = None
+        self._table_matches = False
+
+    @property
+    def deterministic(self) -> bool:
+        return self.fallback.deterministic
+
+    def __getstate__(self) -> dict:
+        # The memory map is reopened lazily wherever the strategy is unpickled
+        state = self.__dict__.copy()
+        state.update(_table=None, _checked_lines=None, _table_matches=False)
+        return state
+
+    @abstractmethod
+    def _table_move(self, playable_options: Set[int], game_state: Dict[str, NumberState]) -> Optional[Tuple[int, str]]:
+        """Return (choice, explanation) from the table for a board of its map, or None"""
+        pass
+
+    def _lookup(self, playable_options: Set[int], game_state: Dict[str, NumberState], options: List[List[int]]) -> Optional[Tuple[int, str]]:
+        if self._table is None:
+            self._table = MappedTable(self.table_path)
+            self._numbers = self._table.metadata["numbers"]
+            self._index = {num: i for i, num in enumerate(self._numbers)}
+        if options is not self._checked_lines:
+            self._checked_lines = options
+            self._table_matches = (self._table.metadata["lines"] == lines_digest(options)
+                                   and CompiledMap.for_lines(options).numbers == self._numbers)
+        if not self._table_matches:
+            return None
+        move = self._table_move(playable_options, game_state)
+        if move is None or move[0] not in playable_options:
+            return None
+        return move
+
+    def select_best_option(self, playable_options: Set[int], game_state: Dict[str, NumberState], options: List[List[int]]) -> int:
+        move = self._lookup(playable_options, game_state, options)
+        if move is not None:
+            self.hits += 1
+            return move[0]
+        self.misses += 1
+        return self.fallback.select_best_option(playable_options, game_state, options)
+
+    def explain_selection(self, playable_options: Set[int], game_state: Dict[str, NumberState], options: List[List[int]]) -> Tuple[int, str]:
+        move = self._lookup(playable_options, game_state, options)
+        if move is not None:
+            self.hits += 1
+            return move
+        self.misses += 1
+        return self.fallback.explain_selection(playable_options, game_state, options)
+
+    def score_options(self, playable_options: Set[int], game_state: Dict[str, NumberState], options: List[List[int]]) -> Dict[int, float]:
+        return self.fallback.score_options(playable_options, game_state, options)
@@ -0,0 +1,103 @@
+import argparse
+import hashlib
+import struct
+import time
+from typing import Dict, List, Optional, Set, Tuple
+from bing_boing_cli import get_available_strategies
+from bing_boing_game import BingBoingGame
+from board_codec import decode_board, encode_board
+from dice import playable_sets
+from mmap_table import MappedMoveTableStrategy, lines_digest, write_table
+from number_state import NumberState
+from strategy_interface import Strategy
+
+_MOVE = struct.Struct("<H")
+
+def position_key(board: str, playable_options: List[int]) -> int:
+    """Hash a board encoding and its sorted playable options into a 64-bit table key"""
+    text = board + "|" + ",".join(map(str, playable_options))
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "little")
+
+def distinct_playable_sets(board: str, numbers: List[int]) -> List[List[int]]:
+    """Return the distinct sets of playable options over all dice rolls for a board"""
+    uncrossed = {num for num, digit in zip(numbers, board) if digit == "0"}
+    return [list(playable) for playable in sorted(playable_sets(uncrossed))]
+
+def build_opening_book(map_path: str, strategy: Strategy, depth: int, out_path: str) -> int:
+    """
+    Enumerate the positions of the first `depth` turns and store the strategy's moves.
+
+    Starting from the empty board, every distinct set of playable options is
+    evaluated with the strategy, and the board after its choice is expanded on
+    the next turn. The strategy must be deterministic.
+
+    Returns:
+        The number of positions written
+    """
+    game = BingBoingGame(strategy=strategy, save_file=None, simulation_mode=True, map=map_path)
+    numbers = game.compiled.numbers
+    index = {num: i for i, num in enumerate(numbers)}
+    entries: Dict[int, bytes] = {}
+    max_marked = 0
+
+    frontier = {encode_board({str(num): NumberState.not_crossed for num in numbers}, numbers)}
+    for turn in range(depth):
+        next_frontier = set()
+        for board in frontier:
+            max_marked = max(max_marked, len(board) - board.count("0"))
+            game_state = decode_board(board, numbers)
+            for playable in distinct_playable_sets(board, numbers):
+                choice = strategy.select_best_option(set(playable), game_state, game.OPTIONS)
+                entries[position_key(board, playable)] = _MOVE.pack(index[choice])
+                if turn + 1 < depth:
+                    game.restore_state(decode_board(board, numbers))
+                    game.mark_number(choice)
+                    next_frontier.add(encode_board(game.game_state, numbers))
+        print(f"Turn {turn + 1}: {len(frontier)} boards, {len(entries)} positions")
+        frontier = next_frontier
+
+    write_table(out_path, entries, _MOVE.size, {
+        "kind": "opening-book",
+        "strategy": strategy.__class__.__name__,
+        "depth": depth,
+        "max_marked": max_marked,
+        "lines": lines_digest(game.OPTIONS),
+        "numbers": numbers
+    })
+    return len(entries)
+
+class OpeningBookStrategy(MappedMoveTableStrategy):
+    """
+    Plays moves from a precomputed opening book, falling back to live evaluation.
+
+    Boards further into the game than any book position, or not in the book,
+    use the fallback strategy.
+    """
+
+    def _table_move(self, playable_options: Set[int], game_state: Dict[str, NumberState]) -> Optional[Tuple[int, str]]:
+        # Boards further into the game than any book position cannot be in it
+        marked = sum(1 for state in game_state.values() if state is not NumberState.not_crossed)
+        if marked > self._table.metadata["max_marked"]:
+            return None
+        move = self._table.get(position_key(encode_board(game_state, self._numbers), sorted(playable_options)))
+        if move is None:
+            return None
+        metadata = self._table.metadata
+        return (self._numbers[_MOVE.unpack(move)[0]],
+                f"Opening book move ({metadata['strategy']}, depth {metadata['depth']}).")
+
+def main():
+    strategies = {cls.__name__: cls for cls, _ in get_available_strategies().values()}
+    parser = argparse.ArgumentParser(description="Build an opening book of strategy moves for a map")
+    parser.add_argument("--map", default="./maps/blue.csv")
+    parser.add_argument("--strategy", default="BalancedStrategy", choices=sorted(strategies))
+    parser.add_argument("--depth", type=int, default=3, help="Number of opening turns to enumerate")
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count = build_opening_book(args.map, strategies[args.strategy](), args.depth, args.out)
+    print(f"Wrote {count} positions to {args.out} in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
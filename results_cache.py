@@ -0,0 +1,134 @@
+import hashlib
+import inspect
+import json
+import os
+import sys
+import types
+from typing import List, Optional, Set
+from bing_boing_game import ENGINE_VERSION
+from game_journal import write_atomic
+from game_stats import GameStats
+
+CACHE_FORMAT = "bing-boing-results/1"
+
+def _code_objects(code: types.CodeType):
+    yield code
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            yield from _code_objects(const)
+
+def _referenced_functions(func, seen: Set[object]) -> List[str]:
+    """Source of a function plus every module-level function of its module it calls"""
+    if func in seen:
+        return []
+    seen.add(func)
+    sources = [inspect.getsource(func)]
+    module = sys.modules[func.__module__]
+    for code in _code_objects(func.__code__):
+        for name in code.co_names:
+            value = getattr(module, name, None)
+            if isinstance(value, types.FunctionType) and value.__module__ == func.__module__:
+                sources += _referenced_functions(value, seen)
+    return sources
+
+def _describe(value) -> str:
+    """Stable description of a strategy parameter, including nested strategies"""
+    if isinstance(value, (str, int, float, bool, type(None))):
+        return repr(value)
+    if isinstance(value, (list, tuple)):
+        return "[" + ",".join(_describe(item) for item in value) + "]"
+    if isinstance(value, dict):
+        return "{" + ",".join(f"{_describe(k)}:{_describe(v)}" for k, v in sorted(value.items(), key=lambda x: repr(x[0]))) + "}"
+    if hasattr(value, "__dict__"):
+        state = value.__getstate__() if hasattr(type(value), "__getstate__") else vars(value)
+        return f"{type(value).__qualname__}{_describe(state)}"
+    return repr(value)
+
+def strategy_fingerprint(strategy) -> str:
+    """
+    Hash the code and parameters a strategy's decisions depend on.
+
+    Covers the source of the strategy's class and its base classes, the
+    module-level helpers their methods call, and the instance's attributes,
+    so editing one strategy does not invalidate the others in its module.
+    """
+    seen: Set[object] = set()
+    sources = []
+    for cls in type(strategy).__mro__:
+        if cls.__module__ in ("builtins", "abc"):
+            continue
+        sources.append(inspect.getsource(cls))
+        for member in vars(cls).values():
+            if isinstance(member, (staticmethod, classmethod)):
+                member = member.__func__
+            if isinstance(member, types.FunctionType):
+                sources += _referenced_functions(member, seen)[1:]
+    sources.append(_describe(strategy))
+    return hashlib.sha256("\0".join(sources).encode()).hexdigest()
+
+def cache_key(strategy, map_path: str, seed: int, num_games: int) -> str:
+    """Content address of the results of one seeded strategy run"""
+    digest = hashlib.sha256()
+    with open(map_path, "rb") as file:
+        map_digest = hashlib.sha256(file.read()).hexdigest()
+    for part in (CACHE_FORMAT, ENGINE_VERSION, strategy_fingerprint(strategy), map_digest, str(seed), str(num_games)):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+class ResultsCache:
+    """
+    On-disk cache of simulated games, addressed by the content they depend on.
+
+    Entries are only valid for seeded runs, whose games are reproducible.
+    When the cache grows past max_bytes the least recently used entries are
+    deleted; reading an entry counts as a use.
+    """
+
+    def __init__(self, directory: str = "results_cache", max_bytes: int = 256 * 2 ** 20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key: str) -> Optional[List[GameStats]]:
+        """Return the cached games for a key, or None"""
+        path = self._path(key)
+        try:
+            with open(path) as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        os.utime(path)
+        self.hits += 1
+        return [GameStats.from_dict(game) for game in entry["games"]]
+
+    def put(self, key: str, games: List[GameStats]) -> None:
+        """Store the games for a key, evicting old entries if over the size limit"""
+        write_atomic(self._path(key), json.dumps({
+            "format": CACHE_FORMAT,
+            "games": [game.to_dict() for game in games]
+        }, separators=(',', ':')))
+        self.evict()
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache fits; returns the number deleted"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        deleted = 0
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total -= size
+            deleted += 1
+        return deleted
@@ -0,0 +1,307 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from multiprocessing import Process
+from typing import Dict, List, Optional, Tuple
+from tabulate import tabulate
+from bing_boing_cli import get_available_strategies
+from bing_boing_game import ENGINE_VERSION
+from bing_boing_simulation_runner import SimulationResults, play_games, summarize_games
+from game_journal import write_atomic
+from game_stats import GameStats
+
+PARTIAL_FORMAT = "bing-boing-partial/1"
+
+def strategy_classes() -> Dict[str, type]:
+    return {cls.__name__: cls for cls, _ in get_available_strategies().values()}
+
+def map_tag(map: str) -> str:
+    """Short name for a map path, unique per path so same-named maps in different directories differ"""
+    name = os.path.splitext(os.path.basename(map))[0]
+    return f"{name}.{hashlib.sha256(os.path.normpath(map).encode()).hexdigest()[:8]}"
+
+def plan_units(strategy_names: List[str], maps: List[str], seeds: List[int],
+               num_games: int, chunk_size: int) -> List[dict]:
+    """
+    Split (strategy, map, seed) runs into work units of at most chunk_size games.
+
+    A unit covers games [start, stop) of one seeded run; as every game is
+    seeded from its own index, units can be played anywhere in any order.
+    """
+    units = []
+    for start in range(0, num_games, chunk_size):
+        for strategy_name in strategy_names:
+            for map in maps:
+                for seed in seeds:
+                    units.append({
+                        "unit_id": f"{strategy_name}-{map_tag(map)}-{seed}-{start}",
+                        "strategy": strategy_name,
+                        "map": map,
+                        "seed": seed,
+                        "start": start,
+                        "stop": min(start + chunk_size, num_games),
+                        "num_games": num_games,
+                        "chunk_size": chunk_size
+                    })
+    return units
+
+class WorkQueue:
+    """
+    Hands out work units to workers and tracks their completion.
+
+    A unit pulled by a worker is leased; if it is not acknowledged within
+    lease_timeout seconds it goes back to the queue for another worker.
+    """
+
+    def __init__(self, units: List[dict], lease_timeout: float = 300.0):
+        self.units = {unit["unit_id"]: unit for unit in units}
+        self.pending = [unit["unit_id"] for unit in units]
+        self.leases: Dict[str, float] = {}
+        self.completed = set()
+        self.lease_timeout = lease_timeout
+        self.lock = threading.Lock()
+        self.finished = threading.Event()
+
+    def pull(self) -> Tuple[Optional[dict], bool]:
+        """
+        Returns:
+            Tuple of (unit, done); unit is None when nothing is available right
+            now, and done is True once every unit has been completed
+        """
+        with self.lock:
+            now = time.monotonic()
+            for unit_id, leased_at in list(self.leases.items()):
+                if now - leased_at > self.lease_timeout:
+                    del self.leases[unit_id]
+                    self.pending.append(unit_id)
+            if not self.pending:
+                return None, self.finished.is_set()
+            unit_id = self.pending.pop(0)
+            self.leases[unit_id] = now
+            return self.units[unit_id], False
+
+    def ack(self, unit_id: str) -> None:
+        with self.lock:
+            if unit_id not in self.units:
+                return
+            self.leases.pop(unit_id, None)
+            if unit_id in self.pending:
+                self.pending.remove(unit_id)
+            self.completed.add(unit_id)
+            if len(self.completed) == len(self.units):
+                self.finished.set()
+
+class _QueueHandler(socketserver.StreamRequestHandler):
+    """Serves one worker connection: JSON-lines pull/ack requests"""
+
+    def handle(self) -> None:
+        queue: WorkQueue = self.server.queue
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                if request.get("op") == "pull":
+                    unit, done = queue.pull()
+                    response = {"unit": unit, "done": done}
+                elif request.get("op") == "ack":
+                    queue.ack(request["unit_id"])
+                    response = {"ok": True}
+                else:
+                    response = {"error": f"Unknown op: {request.get('op')}"}
+            except (ValueError, KeyError, AttributeError) as error:
+                response = {"error": str(error)}
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+
+class Coordinator(socketserver.ThreadingTCPServer):
+    """Plain TCP work queue that sharded workers pull units from"""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, units: List[dict], host: str = "0.0.0.0", port: int = 8766, lease_timeout: float = 300.0):
+        super().__init__((host, port), _QueueHandler)
+        self.queue = WorkQueue(units, lease_timeout)
+
+    def serve_until_done(self) -> None:
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        total = len(self.queue.units)
+        while not self.queue.finished.wait(timeout=1.0):
+            print(f"\rCompleted {len(self.queue.completed)}/{total} work units", end="", flush=True)
+        print(f"\rCompleted {total}/{total} work units")
+        # Keep answering for a moment so idle workers learn that the run is done
+        time.sleep(2.0)
+        self.shutdown()
+        self.server_close()
+
+def partial_path(out_dir: str, unit_id: str) -> str:
+    return os.path.join(out_dir, f"{unit_id}.json")
+
+def write_partial(unit: dict, games: List[GameStats], out_dir: str, worker: str) -> str:
+    """Write the self-describing result file of a completed unit"""
+    partial = {
+        "format": PARTIAL_FORMAT,
+        "engine_version": ENGINE_VERSION,
+        "worker": worker,
+        "unit": unit,
+        "games": [game.to_dict() for game in games]
+    }
+    path = partial_path(out_dir, unit["unit_id"])
+    write_atomic(path, json.dumps(partial, separators=(',', ':')))
+    return path
+
+def run_worker(host: str, port: int, out_dir: str, poll_interval: float = 1.0) -> int:
+    """
+    Pull units from a coordinator until the run is done.
+
+    Returns:
+        The number of units this worker completed
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    classes = strategy_classes()
+    completed = 0
+    with socket.create_connection((host, port)) as connection:
+        stream = connection.makefile("rwb")
+
+        def call(request: dict) -> dict:
+            stream.write(json.dumps(request).encode() + b"\n")
+            stream.flush()
+            return json.loads(stream.readline())
+
+        while True:
+            response = call({"op": "pull", "worker": worker})
+            unit = response.get("unit")
+            if unit is None:
+                if response.get("done"):
+                    return completed
+                time.sleep(poll_interval)
+                continue
+            games = play_games(classes[unit["strategy"]](), unit["map"], range(unit["start"], unit["stop"]), unit["seed"])
+            write_partial(unit, games, out_dir, worker)
+            call({"op": "ack", "unit_id": unit["unit_id"]})
+            completed += 1
+
+def merge_partials(paths: List[str]) -> Dict[Tuple[str, str, int], SimulationResults]:
+    """
+    Combine partial results into one SimulationResults per (strategy, map, seed).
+
+    The result for each run equals run_simulation(strategy, num_games, map, seed)
+    played on a single host. Raises ValueError if partials come from different
+    engine versions, the partials of a run were planned with different game
+    counts or chunk sizes, or a run has missing or overlapping games.
+    """
+    runs: Dict[Tuple[str, str, int], Dict[Tuple[int, int], List[GameStats]]] = {}
+    plans: Dict[Tuple[str, str, int], Tuple[int, int]] = {}
+    for path in paths:
+        with open(path, "r") as file:
+            partial = json.load(file)
+        if partial.get("format") != PARTIAL_FORMAT:
+            raise ValueError(f"{path} is not a partial simulation result")
+        if partial["engine_version"] != ENGINE_VERSION:
+            raise ValueError(f"{path} was produced by engine version {partial['engine_version']}, expected {ENGINE_VERSION}")
+        unit = partial["unit"]
+        key = (unit["strategy"], unit["map"], unit["seed"])
+        run = runs.setdefault(key, {})
+        plan = (unit["num_games"], unit.get("chunk_size"))
+        if plans.setdefault(key, plan) != plan:
+            raise ValueError(f"{path} was planned for {plan[0]} games in chunks of {plan[1]}, but other "
+                             f"partials of run {key} for {plans[key][0]} games in chunks of {plans[key][1]}")
+        # A unit re-run after an expired lease yields an identical duplicate
+        run[(unit["start"], unit["stop"])] = [GameStats.from_dict(game) for game in partial["games"]]
+
+    results = {}
+    for key, chunks in sorted(runs.items()):
+        games: List[GameStats] = []
+        for start, stop in sorted(chunks):
+            if start != len(games):
+                raise ValueError(f"Run {key} has missing or overlapping games at index {start}")
+            games.extend(chunks[(start, stop)])
+        if len(games) != plans[key][0]:
+            raise ValueError(f"Run {key} has {len(games)} of {plans[key][0]} games")
+        results[key] = summarize_games(key[0], games)
+    return results
+
+def display_merged(results: Dict[Tuple[str, str, int], SimulationResults]) -> None:
+    headers = ["Map", "Seed", "Strategy", "Games", "Avg Turns", "Boing Efficiency", "Marks/Turn", "Average Boing Count"]
+    table_data = []
+    for (strategy_name, map, seed), result in results.items():
+        table_data.append([
+            os.path.splitext(os.path.basename(map))[0],
+            seed,
+            strategy_name,
+            result.games_played,
+            f"{result.avg_turns:.4f}",
+            f"{result.avg_boing_efficiency:.4f}%",
+            f"{result.avg_marks_per_turn:.4f}",
+            f"{result.avg_boing_count:.4f}"
+        ])
+    table_data.sort(key=lambda x: (x[0], x[1], float(x[4])))
+    print("\nSharded Strategy Comparison:")
+    print(tabulate(table_data, headers=headers, tablefmt="grid"))
+
+def run_local(units: List[dict], out_dir: str, workers: int = 2) -> None:
+    """Stand-in for a multi-host run: a coordinator and worker processes on this machine"""
+    coordinator = Coordinator(units, host="127.0.0.1", port=0)
+    host, port = coordinator.server_address
+    processes = [Process(target=run_worker, args=(host, port, out_dir)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    coordinator.serve_until_done()
+    for process in processes:
+        process.join()
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharded Bing Boing strategy simulation")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_plan_arguments(command):
+        command.add_argument("--strategies", nargs="+", default=sorted(strategy_classes()))
+        command.add_argument("--maps", nargs="+", default=['./maps/blue.csv', './maps/yellow.csv'])
+        command.add_argument("--seeds", nargs="+", type=int, default=[0])
+        command.add_argument("--games", type=int, default=420)
+        command.add_argument("--chunk-size", type=int, default=20)
+        command.add_argument("--out", default="partials")
+
+    coordinator = commands.add_parser("coordinator", help="Serve work units to workers")
+    add_plan_arguments(coordinator)
+    coordinator.add_argument("--host", default="0.0.0.0")
+    coordinator.add_argument("--port", type=int, default=8766)
+    coordinator.add_argument("--lease-timeout", type=float, default=300.0)
+
+    worker = commands.add_parser("worker", help="Pull and play work units")
+    worker.add_argument("--host", required=True)
+    worker.add_argument("--port", type=int, default=8766)
+    worker.add_argument("--out", default="partials")
+
+    merge = commands.add_parser("merge", help="Combine partial results")
+    merge.add_argument("--out", default="partials")
+
+    local = commands.add_parser("local", help="Run coordinator and workers on this machine, then merge")
+    add_plan_arguments(local)
+    local.add_argument("--workers", type=int, default=os.cpu_count())
+
+    args = parser.parse_args()
+    if args.command in ("coordinator", "local"):
+        unknown = set(args.strategies) - set(strategy_classes())
+        if unknown:
+            parser.error(f"Unknown strategies: {', '.join(sorted(unknown))}")
+        units = plan_units(args.strategies, args.maps, args.seeds, args.games, args.chunk_size)
+        os.makedirs(args.out, exist_ok=True)
+    if args.command == "coordinator":
+        Coordinator(units, args.host, args.port, args.lease_timeout).serve_until_done()
+    elif args.command == "worker":
+        print(f"Completed {run_worker(args.host, args.port, args.out)} work units")
+    elif args.command == "local":
+        run_local(units, args.out, args.workers)
+        # Only this run's units, ignoring partials left in the directory by other runs
+        display_merged(merge_partials([partial_path(args.out, unit["unit_id"]) for unit in units]))
+    elif args.command == "merge":
+        display_merged(merge_partials(sorted(glob.glob(os.path.join(args.out, "*.json")))))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+import os
+import struct
+import time
+from multiprocessing import Array, Pool, Value
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Iterator, List, Optional, Tuple
+from bing_boing_game import BingBoingGame
+from bing_boing_simulation_runner import SimulationResults, default_strategies, summarize_games
+from board_codec import pack_board, unpack_board
+from game_stats import GameStats
+from map import CompiledMap, FileMap, Map
+from simulation_matrix import build_work_units, display_matrix
+from simulation_telemetry import RunTelemetry
+
+# Cell, seed position, game index, turns, bings, boings, won; followed by the packed final board
+_RECORD_HEADER = struct.Struct("<HHIHHHB")
+# Consumer position, producer position
+_RING_HEADER = struct.Struct("<QQ")
+_POSITION = struct.Struct("<Q")
+
+def publish_lines(lines: List[List[int]]) -> SharedMemory:
+    """Copy a compiled map's lines into a new shared memory block"""
+    values = [len(lines)] + [len(line) for line in lines] + [num for line in lines for num in line]
+    block = SharedMemory(create=True, size=4 * len(values))
+    struct.pack_into(f"<{len(values)}i", block.buf, 0, *values)
+    return block
+
+def attach_lines(block: SharedMemory) -> List[List[int]]:
+    """Read the lines written by publish_lines"""
+    count = struct.unpack_from("<i", block.buf, 0)[0]
+    lengths = struct.unpack_from(f"<{count}i", block.buf, 4)
+    offset = 4 * (1 + count)
+    lines = []
+    for length in lengths:
+        lines.append(list(struct.unpack_from(f"<{length}i", block.buf, offset)))
+        offset += 4 * length
+    return lines
+
+class SharedLinesMap(Map):
+    """A map known only by its compiled lines, as attached from shared memory"""
+
+    def __init__(self, lines: List[List[int]]):
+        super().__init__(0, 0)
+        self._compiled = CompiledMap(lines)
+
+class RingBuffer:
+    """
+    Single-producer, single-consumer queue of fixed-size records in shared memory.
+
+    The producer copies records into the slot after its position and then
+    advances it; the consumer reads records in place and then advances its
+    own position. Each side only writes its own position, so no lock is
+    needed. A producer finding the ring full waits for the consumer.
+    """
+
+    def __init__(self, block: SharedMemory, record_size: int):
+        self.block = block
+        self.record_size = record_size
+        self.capacity = (block.size - _RING_HEADER.size) // record_size
+
+    @classmethod
+    def create(cls, record_size: int, capacity: int) -> 'RingBuffer':
+        block = SharedMemory(create=True, size=_RING_HEADER.size + record_size * capacity)
+        _RING_HEADER.pack_into(block.buf, 0, 0, 0)
+        return cls(block, record_size)
+
+    def _slot(self, position: int) -> int:
+        return _RING_HEADER.size + (position % self.capacity) * self.record_size
+
+    def put(self, record: bytes) -> None:
+        buf = self.block.buf
+        position = _POSITION.unpack_from(buf, 8)[0]
+        while position - _POSITION.unpack_from(buf, 0)[0] >= self.capacity:
+            time.sleep(0.0005)
+        slot = self._slot(position)
+        buf[slot:slot + len(record)] = record
+        _POSITION.pack_into(buf, 8, position + 1)
+
+    def drain(self) -> Iterator[Tuple[memoryview, int]]:
+        """Yield (buffer, offset) for every waiting record, freeing each after it is used"""
+        buf = self.block.buf
+        position, end = _RING_HEADER.unpack_from(buf, 0)
+        while position < end:
+            yield buf, self._slot(position)
+            position += 1
+            _POSITION.pack_into(buf, 0, position)
+
+_worker: dict = {}
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def _init_worker(line_blocks: Dict[str, str], ring_names: List[str], record_size: int, ring_owners, workers_replaced) -> None:
+    """
+    Attach a pool process to the shared maps and claim a ring of its own.
+
+    Rings are claimed by slot, so a process the pool starts to replace one
+    that died takes over the dead process's ring. The aggregator sees the
+    replacement through workers_replaced.
+    """
+    with ring_owners.get_lock():
+        ring_index = next(i for i, owner in enumerate(ring_owners) if owner == 0 or not _process_alive(owner))
+        if ring_owners[ring_index] != 0:
+            workers_replaced.value += 1
+        ring_owners[ring_index] = os.getpid()
+    # Blocks are kept referenced, as the attached lines and ring point into them
+    blocks = {map_path: SharedMemory(name) for map_path, name in line_blocks.items()}
+    _worker["blocks"] = blocks
+    _worker["maps"] = {map_path: SharedLinesMap(attach_lines(block)) for map_path, block in blocks.items()}
+    _worker["ring"] = RingBuffer(SharedMemory(ring_names[ring_index]), record_size)
+    _worker["ring_index"] = ring_index
+
+def _run_unit(task) -> int:
+    """Play the games of a work unit, writing one record per game to this process's ring"""
+    cell_index, seed_index, strategy, map_path, seed, start, stop = task
+    game = BingBoingGame(strategy=strategy, save_file=None, simulation_mode=True, map=_worker["maps"][map_path])
+    numbers = game.compiled.numbers
+    ring = _worker["ring"]
+    for game_index, stats in enumerate(game.simulate_many(stop - start, seed, start), start=start):
+        ring.put(_RECORD_HEADER.pack(cell_index, seed_index, game_index, stats.turns_taken, stats.bing_count,
+                                     stats.boing_count, stats.won) + pack_board(stats.final_state, numbers))
+    return stop - start
+
+def run_matrix_shared(strategies, maps: List[str], seeds: List[int], num_games: int = 100,
+                      workers: Optional[int] = None, chunk_size: int = 25, ring_capacity: int = 1024,
+                      metrics_file: Optional[str] = "simulation_metrics.prom") -> Dict[Tuple[str, str], SimulationResults]:
+    """
+    Run the same matrix as simulation_matrix.run_matrix over shared memory.
+
+    Each map's compiled lines are placed in shared memory once instead of
+    being compiled by every worker, and workers report games as fixed-width
+    records (counts plus the final board packed at two bits per number) in a
+    ring buffer per process. Only the small work unit descriptions and game
+    counts go through the pool's pipes. Results match run_matrix.
+
+    Raises RuntimeError if a worker process dies, as the pool cannot tell
+    which work unit was lost with it.
+    """
+    workers = workers or os.cpu_count()
+    compiled = {map_path: FileMap(map_path).compile() for map_path in maps}
+    numbers = {map_path: compiled[map_path].numbers for map_path in maps}
+    board_size = max((len(nums) + 3) // 4 for nums in numbers.values())
+    record_size = _RECORD_HEADER.size + board_size
+
+    cells = [(strategy.__class__.__name__, map_path) for strategy in strategies for map_path in maps]
+    cell_index = {cell: i for i, cell in enumerate(cells)}
+    seed_index = {seed: i for i, seed in enumerate(seeds)}
+    tasks = [(cell_index[unit.cell], seed_index[unit.seed], unit.strategy, unit.map, unit.seed, unit.start, unit.stop)
+             for unit in build_work_units(strategies, maps, seeds, num_games, chunk_size)]
+
+    line_blocks = {map_path: publish_lines(compiled[map_path].lines) for map_path in maps}
+    rings = [RingBuffer.create(record_size, ring_capacity) for _ in range(workers)]
+    finished: Dict[int, List[Tuple[int, int, GameStats]]] = {i: [] for i in range(len(cells))}
+    telemetry = RunTelemetry(num_games * len(cells) * len(seeds), metrics_file)
+    workers_replaced = Value("i", 0)
+    try:
+        with Pool(processes=workers, initializer=_init_worker,
+                  initargs=({map_path: block.name for map_path, block in line_blocks.items()},
+                            [ring.block.name for ring in rings], record_size, Array("i", workers),
+                            workers_replaced)) as pool:
+            pending = pool.map_async(_run_unit, tasks, chunksize=1)
+            while True:
+                if workers_replaced.value:
+                    raise RuntimeError("A simulation worker process died; its work unit was lost")
+                # Once every unit has returned, one more pass collects their last records
+                done = pending.ready()
+                for ring_index, ring in enumerate(rings):
+                    for buf, offset in ring.drain():
+                        cell, seed_position, game_index, turns, bings, boings, won = _RECORD_HEADER.unpack_from(buf, offset)
+                        board_start = offset + _RECORD_HEADER.size
+                        strategy_name, map_path = cells[cell]
+                        stats = GameStats.from_counts(turns, bings, boings, bool(won),
+                                                      unpack_board(buf[board_start:board_start + board_size],
+                                                                   numbers[map_path]))
+                        finished[cell].append((seed_position, game_index, stats))
+                        telemetry.record_game(strategy_name, turns, worker=str(ring_index))
+                if done:
+                    break
+                time.sleep(0.001)
+            pending.get()
+        telemetry.finish()
+    finally:
+        for block in list(line_blocks.values()) + [ring.block for ring in rings]:
+            block.close()
+            block.unlink()
+
+    results = {}
+    for i, cell in enumerate(cells):
+        games = [stats for _, _, stats in sorted(finished[i], key=lambda x: (x[0], x[1]))]
+        results[cell] = summarize_games(cell[0], games)
+    return results
+
+if __name__ == "__main__":
+    matrix_results = run_matrix_shared(
+        strategies=default_strategies(),
+        maps=['./maps/blue.csv', './maps/yellow.csv'],
+        seeds=[0, 1, 2],
+        num_games=140
+    )
+    display_matrix(matrix_results)
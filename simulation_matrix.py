@@ -0,0 +1,107 @@
+import os
+from dataclasses import dataclass
+from multiprocessing import Pool
+from typing import Dict, List, Optional, Tuple
+from tabulate import tabulate
+from bing_boing_simulation_runner import SimulationResults, default_strategies, play_games, summarize_games
+from game_stats import GameStats
+from simulation_telemetry import RunTelemetry
+from strategy_interface import Strategy
+
+@dataclass
+class WorkUnit:
+    """A slice of the games of one (strategy, map, seed) run"""
+    strategy: Strategy
+    map: str
+    seed: int
+    start: int
+    stop: int
+
+    @property
+    def cell(self) -> Tuple[str, str]:
+        return self.strategy.__class__.__name__, self.map
+
+def build_work_units(strategies: List[Strategy], maps: List[str], seeds: List[int],
+                     num_games: int, chunk_size: int) -> List[WorkUnit]:
+    """
+    Split every (strategy, map, seed) run into chunks of at most chunk_size games.
+
+    Chunks are interleaved across cells so that slow strategies are spread over
+    all workers instead of queueing up behind each other.
+    """
+    runs = [(strategy, map, seed) for strategy in strategies for map in maps for seed in seeds]
+    units: List[WorkUnit] = []
+    for start in range(0, num_games, chunk_size):
+        stop = min(start + chunk_size, num_games)
+        for strategy, map, seed in runs:
+            units.append(WorkUnit(strategy, map, seed, start, stop))
+    return units
+
+def run_work_unit(unit: WorkUnit) -> Tuple[WorkUnit, List[GameStats], int]:
+    """Play the games of a work unit, returning them with the worker's process id"""
+    return unit, play_games(unit.strategy, unit.map, range(unit.start, unit.stop), unit.seed), os.getpid()
+
+def run_matrix(strategies: List[Strategy], maps: List[str], seeds: List[int], num_games: int = 100,
+               workers: Optional[int] = None, chunk_size: int = 25,
+               metrics_file: Optional[str] = "simulation_metrics.prom") -> Dict[Tuple[str, str], SimulationResults]:
+    """
+    Simulate every strategy on every map for every seed as one pool of work.
+
+    Games are reported to a RunTelemetry per worker process as their work
+    units complete, writing Prometheus metrics to metrics_file unless it is None.
+
+    Returns:
+        Results per (strategy name, map) cell, combining num_games games for
+        each seed in the order the seeds were given
+    """
+    units = build_work_units(strategies, maps, seeds, num_games, chunk_size)
+    seed_order = {seed: i for i, seed in enumerate(seeds)}
+    finished: Dict[Tuple[str, str], List[Tuple[Tuple[int, int], List[GameStats]]]] = {}
+    telemetry = RunTelemetry(num_games * len(strategies) * len(maps) * len(seeds), metrics_file)
+
+    with Pool(processes=workers or os.cpu_count()) as pool:
+        for unit, games, worker in pool.imap_unordered(run_work_unit, units):
+            finished.setdefault(unit.cell, []).append(((seed_order[unit.seed], unit.start), games))
+            for game in games:
+                telemetry.record_game(unit.cell[0], game.turns_taken, worker=str(worker))
+    telemetry.finish()
+
+    results = {}
+    for strategy in strategies:
+        for map in maps:
+            cell = (strategy.__class__.__name__, map)
+            games = [game for _, chunk in sorted(finished[cell], key=lambda x: x[0]) for game in chunk]
+            results[cell] = summarize_games(cell[0], games)
+    return results
+
+def display_matrix(results: Dict[Tuple[str, str], SimulationResults]) -> None:
+    """Print one comparison table covering every (strategy, map) cell"""
+    headers = ["Map", "Strategy", "Games", "Avg Turns", "Boing Efficiency", "Marks/Turn", "Average Boing Count", "Win Rate"]
+    table_data = []
+
+    for (strategy_name, map), result in results.items():
+        table_data.append([
+            os.path.splitext(os.path.basename(map))[0],
+            strategy_name,
+            result.games_played,
+            f"{result.avg_turns:.4f}",
+            f"{result.avg_boing_efficiency:.4f}%",
+            f"{result.avg_marks_per_turn:.4f}",
+            f"{result.avg_boing_count:.4f}",
+            f"{result.win_rate:.1f}%"
+        ])
+
+    # Group by map, best average turns first
+    table_data.sort(key=lambda x: (x[0], float(x[3])))
+
+    print("\nStrategy x Map Comparison:")
+    print(tabulate(table_data, headers=headers, tablefmt="grid"))
+
+if __name__ == "__main__":
+    matrix_results = run_matrix(
+        strategies=default_strategies(),
+        maps=['./maps/blue.csv', './maps/yellow.csv'],
+        seeds=[0, 1, 2],
+        num_games=140
+    )
+    display_matrix(matrix_results)
@@ -0,0 +1,172 @@
+import math
+import sys
+import time
+from typing import Dict, Optional, Tuple
+from game_journal import write_atomic
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+class _RunningTurns:
+    """Running mean and variance of turns per game (Welford's algorithm)"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, turns: int) -> None:
+        self.count += 1
+        delta = turns - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (turns - self.mean)
+
+    def ci95(self) -> float:
+        """Half-width of the 95% confidence interval of the mean"""
+        if self.count < 2:
+            return math.inf
+        return 1.96 * math.sqrt(self._m2 / (self.count - 1) / self.count)
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process plus its finished children, if known"""
+    if resource is None:
+        return None
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, children) * scale
+
+class RunTelemetry:
+    """
+    Tracks the progress of a simulation run as games complete.
+
+    Shows a live progress line (games/sec, running average turns with 95%
+    confidence interval, ETA, peak RSS) and periodically rewrites a metrics
+    file in the Prometheus text exposition format so batch jobs can be
+    scraped, e.g. through node_exporter's textfile collector.
+    """
+
+    def __init__(self, total_games: int, metrics_file: Optional[str] = "simulation_metrics.prom",
+                 refresh_interval: float = 0.5, metrics_interval: float = 5.0, output=None):
+        self.total_games = total_games
+        self.metrics_file = metrics_file
+        self.refresh_interval = refresh_interval
+        self.metrics_interval = metrics_interval
+        self.output = output or sys.stderr
+        self.started = time.monotonic()
+        self.games = 0
+        self.turns: Dict[str, _RunningTurns] = {}
+        self.strategy_started: Dict[str, float] = {}
+        self.worker_games: Dict[Tuple[str, str], int] = {}
+        self.worker_started: Dict[Tuple[str, str], float] = {}
+        self._current: Optional[str] = None
+        self._last_game = self.started
+        self._last_refresh = 0.0
+        self._last_metrics = 0.0
+
+    def record_game(self, strategy_name: str, turns: int, worker: str = "main") -> None:
+        """Account for one finished game"""
+        now = time.monotonic()
+        if strategy_name not in self.turns:
+            # The strategy's first game started when the previous game finished
+            self.turns[strategy_name] = _RunningTurns()
+            self.strategy_started[strategy_name] = self._last_game
+        key = (strategy_name, worker)
+        if key not in self.worker_games:
+            self.worker_games[key] = 0
+            self.worker_started[key] = self.strategy_started[strategy_name]
+        self.turns[strategy_name].add(turns)
+        self.worker_games[key] += 1
+        self.games += 1
+        self._current = strategy_name
+        self._last_game = now
+
+        if now - self._last_refresh >= self.refresh_interval:
+            self._last_refresh = now
+            self._write_progress(now)
+        if self.metrics_file and now - self._last_metrics >= self.metrics_interval:
+            self._last_metrics = now
+            self.write_metrics()
+
+    def _rate(self, games: int, started: float, now: float) -> float:
+        elapsed = now - started
+        return games / elapsed if elapsed > 0 else 0.0
+
+    def eta_seconds(self, now: Optional[float] = None) -> float:
+        if self.games >= self.total_games:
+            return 0.0
+        now = now or time.monotonic()
+        rate = self._rate(self.games, self.started, now)
+        return (self.total_games - self.games) / rate if rate > 0 else math.inf
+
+    def _write_progress(self, now: float) -> None:
+        strategy_name = self._current
+        turns = self.turns[strategy_name]
+        rate = self._rate(turns.count, self.strategy_started[strategy_name], now)
+        rss = peak_rss_bytes()
+        line = (f"[{strategy_name}] {self.games}/{self.total_games} games"
+                f" | {rate:.1f} games/s"
+                f" | avg turns {turns.mean:.2f} ± {turns.ci95():.2f}"
+                f" | ETA {self.eta_seconds(now):.0f}s")
+        if rss is not None:
+            line += f" | peak RSS {rss / 2 ** 20:.1f} MB"
+        self.output.write("\r" + line.ljust(100))
+        self.output.flush()
+
+    def write_metrics(self) -> None:
+        """Rewrite the Prometheus metrics file with the current totals"""
+        now = time.monotonic()
+        lines = [
+            "# HELP bingboing_games_total Games simulated so far.",
+            "# TYPE bingboing_games_total counter"
+        ]
+        for (strategy_name, worker), games in sorted(self.worker_games.items()):
+            lines.append(f'bingboing_games_total{{strategy="{strategy_name}",worker="{worker}"}} {games}')
+        lines += [
+            "# HELP bingboing_games_per_second Average simulation throughput since the strategy started.",
+            "# TYPE bingboing_games_per_second gauge"
+        ]
+        for key, games in sorted(self.worker_games.items()):
+            strategy_name, worker = key
+            rate = self._rate(games, self.worker_started[key], now)
+            lines.append(f'bingboing_games_per_second{{strategy="{strategy_name}",worker="{worker}"}} {rate:.3f}')
+        lines += [
+            "# HELP bingboing_avg_turns Running mean of turns per game.",
+            "# TYPE bingboing_avg_turns gauge"
+        ]
+        for strategy_name, turns in sorted(self.turns.items()):
+            lines.append(f'bingboing_avg_turns{{strategy="{strategy_name}"}} {turns.mean:.4f}')
+        lines += [
+            "# HELP bingboing_avg_turns_ci95 Half-width of the 95% confidence interval of the mean turns.",
+            "# TYPE bingboing_avg_turns_ci95 gauge"
+        ]
+        for strategy_name, turns in sorted(self.turns.items()):
+            lines.append(f'bingboing_avg_turns_ci95{{strategy="{strategy_name}"}} {turns.ci95():.4f}')
+        lines += [
+            "# HELP bingboing_run_games_planned Games planned for the whole run.",
+            "# TYPE bingboing_run_games_planned gauge",
+            f"bingboing_run_games_planned {self.total_games}",
+            "# HELP bingboing_run_eta_seconds Estimated seconds until the run completes.",
+            "# TYPE bingboing_run_eta_seconds gauge",
+            f"bingboing_run_eta_seconds {self.eta_seconds(now):.1f}"
+        ]
+        rss = peak_rss_bytes()
+        if rss is not None:
+            lines += [
+                "# HELP bingboing_peak_rss_bytes Peak resident set size of the run.",
+                "# TYPE bingboing_peak_rss_bytes gauge",
+                f"bingboing_peak_rss_bytes {rss}"
+            ]
+        write_atomic(self.metrics_file, "\n".join(lines) + "\n")
+
+    def finish(self) -> None:
+        """Show the final progress line and write the final metrics"""
+        if self._current is not None:
+            self._write_progress(time.monotonic())
+            self.output.write("\n")
+            self.output.flush()
+        if self.metrics_file:
+            self.write_metrics()
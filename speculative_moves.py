@@ -0,0 +1,76 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from dice import playable_sets
+from number_state import NumberState
+from strategy_interface import Strategy
+
+class SpeculativeMoves:
+    """
+    Precomputes the strategy's move for every possible roll while the player is idle.
+
+    After each turn, start() hands a copy of the board to a background thread,
+    which evaluates the strategy for each distinct set of playable options,
+    most likely rolls first. When the dice are entered, lookup() returns the
+    ready move, or None if it has not been computed yet, in which case the
+    caller evaluates the strategy itself.
+
+    Only deterministic strategies should be speculated on: the background
+    thread would otherwise draw from the random module between dice rolls.
+    """
+
+    def __init__(self, strategy: Strategy):
+        self.strategy = strategy
+        self.hits = 0
+        self.misses = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speculate")
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._table: Dict[Tuple[int, ...], Tuple[int, str]] = {}
+
+    def start(self, game_state: Dict[str, NumberState], options: List[List[int]]) -> None:
+        """Discard the previous table and precompute the moves for a new board"""
+        with self._lock:
+            self._generation += 1
+            self._table = {}
+            generation = self._generation
+        self._executor.submit(self._precompute, generation, dict(game_state), options)
+
+    def _precompute(self, generation: int, game_state: Dict[str, NumberState], options: List[List[int]]) -> None:
+        uncrossed = {int(num) for num, state in game_state.items() if state == NumberState.not_crossed}
+        rolls = playable_sets(uncrossed)
+        for playable in sorted(rolls, key=lambda playable: -rolls[playable]):
+            if generation != self._generation:
+                return
+            move = self.strategy.explain_selection(set(playable), game_state, options)
+            with self._lock:
+                if generation != self._generation:
+                    return
+                self._table[playable] = move
+
+    def lookup(self, playable_options: List[int]) -> Optional[Tuple[int, str]]:
+        """
+        Return the precomputed (choice, explanation) for the rolled options, if ready.
+
+        Any background work still running is cancelled, as the board is about
+        to change.
+        """
+        with self._lock:
+            move = self._table.get(tuple(sorted(playable_options)))
+            self._generation += 1
+            self._table = {}
+        if move is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return move
+
+    def cancel(self) -> None:
+        """Stop any background work and discard the table, as the board is about to change"""
+        with self._lock:
+            self._generation += 1
+            self._table = {}
+
+    def close(self) -> None:
+        self.cancel()
+        self._executor.shutdown(wait=True)
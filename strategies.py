@@ -1,6 +1,7 @@
 from strategy_interface import Strategy
 from typing import List, Dict, Set
 from number_state import NumberState
+from map import CompiledMap
 import random
 
 class ChainReactionMaximiser(Strategy):
@@ -8,19 +9,20 @@ class ChainReactionMaximiser(Strategy):
     
     def select_best_option(self, playable_options: Set[int], game_state: Dict[str, NumberState], 
                           options: List[List[int]]) -> int:
+        compiled = CompiledMap.for_lines(options)
         best_option = None
         max_chain_length = -1
         
         for number in playable_options:
-            chain_length = self._simulate_chain_reaction(number, game_state.copy(), options)
+            chain_length = self._simulate_chain_reaction(number, game_state, options)
             
             if chain_length > max_chain_length:
                 max_chain_length = chain_length
                 best_option = number
             elif chain_length == max_chain_length and best_option is not None:
                 # If equal chain lengths, prefer the number that appears in more lines
-                current_lines = sum(1 for option in options if number in option)
-                best_lines = sum(1 for option in options if best_option in option)
+                current_lines = len(compiled.lines_with(number))
+                best_lines = len(compiled.lines_with(best_option))
                 if current_lines > best_lines:
                     best_option = number
         
@@ -33,76 +35,52 @@ class ChainReactionMaximiser(Strategy):
         
         Args:
             number: The number to simulate marking
-            game_state: Copy of current game state
+            game_state: Current game state, left unchanged
             options: List of all valid number combinations
             
         Returns:
             Total number of boings that would be created in the chain reaction
         """
+        compiled = CompiledMap.for_lines(options)
+        # Numbers crossed by the simulation, layered over the real game state
+        marked = {number}
         boings_created = 0
-        affected_lines = set()
         
-        # Mark the initial number as bing
-        game_state[str(number)] = NumberState.bing
-        
-        # Keep track of which lines have already triggered boings
-        processed_lines = set()
-        
-        # Continue until no new boings are created
-        while True:
-            new_boings_this_round = 0
-            
-            # Find all lines that need to be checked
-            lines_to_check = set()
-            for i, option in enumerate(options):
-                if i not in processed_lines:  # Only check unprocessed lines
-                    marked_count = sum(1 for num in option 
-                                     if game_state[str(num)] != NumberState.not_crossed)
-                    unmarked_count = len(option) - marked_count
-                    
-                    if unmarked_count == 1:  # This line will create a boing
-                        lines_to_check.add(i)
+        # Only lines touched by a newly marked number can be left with a single
+        # unmarked number, so follow those instead of rescanning every line
+        lines_to_check = [line_index for line_index, _ in compiled.lines_by_number.get(number, [])]
+        while lines_to_check:
+            option = options[lines_to_check.pop()]
+            unmarked = [num for num in option 
+                        if num not in marked and game_state[str(num)] == NumberState.not_crossed]
             
-            if not lines_to_check:
-                break
-                
-            # Process all found lines
-            for line_index in lines_to_check:
-                option = options[line_index]
-                # Find the unmarked number in this line
-                for num in option:
-                    if game_state[str(num)] == NumberState.not_crossed:
-                        game_state[str(num)] = NumberState.boing
-                        new_boings_this_round += 1
-                        break
-                processed_lines.add(line_index)
-            
-            boings_created += new_boings_this_round
-            if new_boings_this_round == 0:
-                break
+            if len(unmarked) == 1:  # This line creates a boing
+                boing = unmarked[0]
+                marked.add(boing)
+                boings_created += 1
+                lines_to_check.extend(line_index for line_index, _ in compiled.lines_by_number[boing])
         
         return boings_created
     
+    def score_options(self, playable_options: Set[int], game_state: Dict[str, NumberState], 
+                      options: List[List[int]]) -> Dict[int, float]:
+        return {number: self._simulate_chain_reaction(number, game_state, options) for number in playable_options}
+    
     def _get_affected_lines(self, number: int, options: List[List[int]]) -> Set[int]:
         """Get indices of all lines containing the given number"""
-        return {i for i, option in enumerate(options) if number in option}
+        return {line_index for line_index, _ in CompiledMap.for_lines(options).lines_by_number.get(number, [])}
 
 class AggressiveBoingStrategy(Strategy):
     """Strategy that aggressively pursues boings by prioritizing moves that create immediate boings"""
     
     def select_best_option(self, playable_options: Set[int], game_state: Dict[str, NumberState], 
                           options: List[List[int]]) -> int:
+        compiled = CompiledMap.for_lines(options)
         best_option = None
         max_immediate_boings = -1
 
         for number in playable_options:
-            immediate_boings = 0
-            for option in options:
-                if number in option:
-                    uncrossed = sum(1 for num in option 
-                                  if game_state[str(num)] == NumberState.not_crossed)
-                    if uncrossed == 2:  # This move will create a boing
-                        immediate_boings += 1
+            immediate_boings = self._count_immediate_boings(number, game_state, compiled)
             
             if immediate_boings > max_immediate_boings:
                 max_immediate_boings = immediate_boings
@@ -110,58 +88,94 @@ class AggressiveBoingStrategy(Strategy):
 
         return best_option or max(playable_options)
 
+    def score_options(self, playable_options: Set[int], game_state: Dict[str, NumberState], 
+                      options: List[List[int]]) -> Dict[int, float]:
+        compiled = CompiledMap.for_lines(options)
+        return {number: self._count_immediate_boings(number, game_state, compiled) for number in playable_options}
+
+    def _count_immediate_boings(self, number: int, game_state: Dict[str, NumberState], compiled: CompiledMap) -> int:
+        """Count the lines in which marking this number leaves a single uncrossed number"""
+        immediate_boings = 0
+        for option in compiled.lines_with(number):
+            uncrossed = sum(1 for num in option 
+                          if game_state[str(num)] == NumberState.not_crossed)
+            if uncrossed == 2:  # This move will create a boing
+                immediate_boings += 1
+        return immediate_boings
+
 class LineCompletionStrategy(Strategy):
     """Strategy that focuses on completing lines sequentially"""
     
     def select_best_option(self, playable_options: Set[int], game_state: Dict[str, NumberState], 
                           options: List[List[int]]) -> int:
+        compiled = CompiledMap.for_lines(options)
         best_option = None
         min_remaining = float('inf')
         
         for number in playable_options:
-            for option in options:
-                if number in option:
-                    remaining = sum(1 for num in option 
-                                  if game_state[str(num)] == NumberState.not_crossed)
-                    if remaining < min_remaining:
-                        min_remaining = remaining
-                        best_option = number
+            for option in compiled.lines_with(number):
+                remaining = sum(1 for num in option 
+                              if game_state[str(num)] == NumberState.not_crossed)
+                if remaining < min_remaining:
+                    min_remaining = remaining
+                    best_option = number
         
         return best_option or min(playable_options)
 
+    def score_options(self, playable_options: Set[int], game_state: Dict[str, NumberState], 
+                      options: List[List[int]]) -> Dict[int, float]:
+        # Fewer uncrossed numbers in the emptiest line containing the option scores higher
+        compiled = CompiledMap.for_lines(options)
+        scores = {}
+        for number in playable_options:
+            remaining = [sum(1 for num in option if game_state[str(num)] == NumberState.not_crossed)
+                         for option in compiled.lines_with(number)]
+            scores[number] = -min(remaining) if remaining else float('-inf')
+        return scores
+
 class BalancedStrategy(Strategy):
     """Strategy that balances between creating boings and completing lines"""
     
     def select_best_option(self, playable_options: Set[int], game_state: Dict[str, NumberState], 
                           options: List[List[int]]) -> int:
+        compiled = CompiledMap.for_lines(options)
         best_option = None
         best_score = float('-inf')
         
         for number in playable_options:
-            boing_potential = 0
-            completion_potential = 0
-            
-            for option in options:
-                if number in option:
-                    uncrossed = sum(1 for num in option 
-                                  if game_state[str(num)] == NumberState.not_crossed)
-                    if uncrossed == 2:  # Will create boing
-                        boing_potential += 3
-                    elif uncrossed == 3:  # Close to creating boing
-                        completion_potential += 2
-                    else:
-                        completion_potential += 1
-            
-            score = boing_potential * 0.6 + completion_potential * 0.4
+            score = self._score(number, game_state, compiled)
             if score > best_score:
                 best_score = score
                 best_option = number
         
         return best_option or max(playable_options)
 
+    def score_options(self, playable_options: Set[int], game_state: Dict[str, NumberState], 
+                      options: List[List[int]]) -> Dict[int, float]:
+        compiled = CompiledMap.for_lines(options)
+        return {number: self._score(number, game_state, compiled) for number in playable_options}
+
+    def _score(self, number: int, game_state: Dict[str, NumberState], compiled: CompiledMap) -> float:
+        """Weighted sum of the boing and line completion potential of marking a number"""
+        boing_potential = 0
+        completion_potential = 0
+        
+        for option in compiled.lines_with(number):
+            uncrossed = sum(1 for num in option 
+                          if game_state[str(num)] == NumberState.not_crossed)
+            if uncrossed == 2:  # Will create boing
+                boing_potential += 3
+            elif uncrossed == 3:  # Close to creating boing
+                completion_potential += 2
+            else:
+                completion_potential += 1
+        
+        return boing_potential * 0.6 + completion_potential * 0.4
+
 class RandomStrategy(Strategy):
     """Strategy that makes random choices among available options"""
-    
+    deterministic = False
+
     def select_best_option(self, playable_options: Set[int], game_state: Dict[str, NumberState], 
                           options: List[List[int]]) -> int:
         return random.choice(list(playable_options))
@@ -171,4 +185,8 @@ class MaxNumberStrategy(Strategy):
     
     def select_best_option(self, playable_options: Set[int], game_state: Dict[str, NumberState], 
                           options: List[List[int]]) -> int:
-        return max(playable_options)
\ No newline at end of file
+        return max(playable_options)
+
+    def score_options(self, playable_options: Set[int], game_state: Dict[str, NumberState], 
+                      options: List[List[int]]) -> Dict[int, float]:
+        return {number: number for number in playable_options}
\ No newline at end of file
@@ -4,6 +4,10 @@ from number_state import NumberState
 
 class Strategy(ABC):
     """Abstract base class for game playing strategies"""
+    # Whether the same board and options always give the same choice without
+    # drawing from the random module, so moves may be computed ahead of time
+    deterministic: bool = True
+
     @abstractmethod
     def select_best_option(self, playable_options: Set[int], game_state: Dict[str, NumberState], options: List[List[int]]) -> int:
         """Select the best option from available moves"""
@@ -19,4 +23,11 @@ class Strategy(ABC):
         """
         best_choice = self.select_best_option(playable_options, game_state, options)
         explanation = "No detailed explanation available for this strategy."
-        return best_choice, explanation
\ No newline at end of file
+        return best_choice, explanation
+
+    def score_options(self, playable_options: Set[int], game_state: Dict[str, NumberState], options: List[List[int]]) -> Dict[int, float]:
+        """
+        Return the score this strategy gives each playable option, higher being better.
+        Used for decision tracing; strategies without a scoring rule return an empty dict.
+        """
+        return {}
@@ -0,0 +1,124 @@
+import sys
+import time
+from typing import Dict, Iterable, List, Set, Tuple
+from game_events import MarkEvent
+from map import Map
+from number_state import NumberState
+
+class TerminalRenderer:
+    """
+    Draws a map's grid with state counts, patching only the cells that change.
+
+    The grid layout (column widths, borders, the cell of every number) is
+    computed once per map. Each turn only the rows containing newly marked
+    numbers are re-joined, and the counts are kept up to date from the marks
+    instead of rescanning the board. With max_fps set, non-forced renders are
+    skipped when they come faster than the target frame rate.
+    """
+
+    def __init__(self, board: Map, max_fps: float = 10.0, max_rows: int = 40, max_cols: int = 40, output=None):
+        self.max_fps = max_fps
+        self.output = output or sys.stdout
+        self.rows = min(board.height, max_rows)
+        self.cols = min(board.width, max_cols)
+        self._cropped = board.height > max_rows or board.width > max_cols
+
+        self._positions: Dict[int, List[Tuple[int, int]]] = {}
+        self._cells: List[List[str]] = []
+        for y in range(self.rows):
+            row = []
+            for x in range(self.cols):
+                tile = board.tiles.get((x, y))
+                if tile:
+                    self._positions.setdefault(tile.number, []).append((y, x))
+                    row.append(self._cell_text(tile.number, NumberState.not_crossed))
+                else:
+                    row.append(".....")
+            self._cells.append(row)
+
+        # Size every column for the widest text any of its cells can show, so
+        # marking a number never shifts the layout
+        self._widths = [5] * self.cols
+        for number, positions in self._positions.items():
+            width = max(len(self._cell_text(number, state)) for state in NumberState)
+            for _, x in positions:
+                self._widths[x] = max(self._widths[x], width)
+        self._border = "+" + "+".join("-" * (width + 2) for width in self._widths) + "+"
+        self._row_text = [self._join_row(y) for y in range(self.rows)]
+
+        self._states: Dict[int, NumberState] = {}
+        self._counts = {state: 0 for state in NumberState}
+        self._dirty_rows: Set[int] = set()
+        self._last_render = 0.0
+
+    @staticmethod
+    def _cell_text(number: int, state: NumberState) -> str:
+        num_str = str(number)
+        if state == NumberState.bing:
+            return f"X {num_str}".rjust(4, '.')
+        if state == NumberState.boing:
+            return f"O {num_str}".rjust(4, '.')
+        return num_str.rjust(4, '.')
+
+    def _join_row(self, y: int) -> str:
+        return "| " + " | ".join(cell.ljust(width) for cell, width in zip(self._cells[y], self._widths)) + " |"
+
+    def reset(self, game_state: Dict[str, NumberState]) -> None:
+        """Redraw every cell from a full game state"""
+        self._states = {}
+        self._counts = {state: 0 for state in NumberState}
+        for num, state in game_state.items():
+            self._show(int(num), state)
+
+    def update(self, events: Iterable[MarkEvent]) -> None:
+        """Apply mark events to the grid; marks already shown are ignored"""
+        for event in events:
+            self._show(event.number, event.mark_type)
+
+    def _show(self, number: int, state: NumberState) -> None:
+        previous = self._states.get(number)
+        if previous == state:
+            return
+        if previous is not None:
+            self._counts[previous] -= 1
+        self._counts[state] += 1
+        self._states[number] = state
+        text = self._cell_text(number, state)
+        for y, x in self._positions.get(number, []):
+            self._cells[y][x] = text
+            self._dirty_rows.add(y)
+
+    def render(self, turns_taken: int, force: bool = True) -> bool:
+        """
+        Write the current frame.
+
+        Returns:
+            False when the frame was skipped to stay under max_fps
+        """
+        now = time.monotonic()
+        if not force and self.max_fps and now - self._last_render < 1 / self.max_fps:
+            return False
+        self._last_render = now
+
+        for y in self._dirty_rows:
+            self._row_text[y] = self._join_row(y)
+        self._dirty_rows.clear()
+
+        lines = ["", "Current game state:", self._border]
+        for text in self._row_text:
+            lines.append(text)
+            lines.append(self._border)
+        if self._cropped:
+            lines.append(f"(showing {self.rows} rows, {self.cols} columns)")
+        lines.extend([
+            "",
+            f"Turns taken: {turns_taken}",
+            f"Total bings (X): {self._counts[NumberState.bing]}",
+            f"Total boings (O): {self._counts[NumberState.boing]}",
+            f"Remaining numbers: {self._counts[NumberState.not_crossed]}",
+            "",
+            ""
+        ])
+        self.output.write("\n".join(lines))
+        self.output.flush()
+        return True
@@ -0,0 +1,62 @@
+import contextlib
+import io
+import random
+import pytest
+import game_journal
+from bing_boing_game import BingBoingGame
+from game_journal import write_atomic
+from number_state import NumberState
+from strategies import BalancedStrategy
+
+def _game(save_file: str) -> BingBoingGame:
+    return BingBoingGame(strategy=BalancedStrategy(), save_file=str(save_file), map="./maps/blue.csv",
+                         snapshot_interval=1000)
+
+def _play(game: BingBoingGame, turns: int) -> None:
+    played = 0
+    while played < turns and not game.game_won:
+        if game.play_turn(*game.roll_dice()):
+            played += 1
+
+def test_turns_after_torn_write_survive_reload(tmp_path):
+    random.seed(3)
+    save_file = tmp_path / "game_state.json"
+    with contextlib.redirect_stdout(io.StringIO()):
+        game = _game(save_file)
+        game.new_game()
+        _play(game, 3)
+        # A crash in the middle of appending a record
+        with open(game.journal.journal_file, "a") as file:
+            file.write('{"t":99,"d":[1')
+
+        resumed = _game(save_file)
+        resumed.load_game_state()
+        assert resumed.turns_taken == 3
+        _play(resumed, 5)
+
+        reloaded = _game(save_file)
+        reloaded.load_game_state()
+    assert reloaded.turns_taken == resumed.turns_taken == 8
+    assert reloaded.game_state == resumed.game_state
+
+def test_new_game_interrupted_before_journal_truncation_starts_fresh(tmp_path, monkeypatch):
+    random.seed(5)
+    save_file = tmp_path / "game_state.json"
+    with contextlib.redirect_stdout(io.StringIO()):
+        game = _game(save_file)
+        game.new_game()
+        _play(game, 5)
+
+        # A crash right after the new game's snapshot has replaced the old one
+        def write_then_crash(path, content, mode="w"):
+            write_atomic(path, content, mode)
+            raise KeyboardInterrupt
+        monkeypatch.setattr(game_journal, "write_atomic", write_then_crash)
+        with pytest.raises(KeyboardInterrupt):
+            game.new_game()
+        monkeypatch.undo()
+
+        reloaded = _game(save_file)
+        reloaded.load_game_state()
+    assert reloaded.turns_taken == 0
+    assert all(state is NumberState.not_crossed for state in reloaded.game_state.values())